@@ -1,16 +1,60 @@
+import importlib
+import json
+import os
 import pandas as pd
 import streamlit as st
-import joblib
-import plotly.express as px
-from fpdf import FPDF
-import textwrap
 from datetime import datetime
-import os
+from hospital_data import WORKBOOK, load_raw_data, workbook_version
+from cost_model import (PREDICTION_COLUMN, load_model, predict_batches, read_patient_file,
+                        validate_features)
+from dashboard_aggregates import GENDER_COLORS, age_box_figure, build_dashboard_cubes
+from table_view import TableView
+from prediction_store import PredictionStore
+from tracing import to_otlp, trace_rows, tracer
+from startup import warmup
+
+FILE = WORKBOOK
+# Set SHOW_TIMINGS=1 or open the app with ?debug=1 to see where each rerun spends its time
+SHOW_TIMINGS = bool(os.getenv("SHOW_TIMINGS"))
+
+# Everything below, including the cached loaders on a cold start, is traced as one rerun
+rerun_span = tracer.start_trace("streamlit.rerun")
+
+
+# Heavy resources the first screen doesn't need; warmed in the background after it is sent
+warmup.register("model", load_model)
+warmup.register("plotly", lambda: importlib.import_module("plotly.express"))
+warmup.register("pdf", lambda: importlib.import_module("pdf_report"))
+
+
+# Shared across sessions and reruns: the model is loaded once per process, on first use
+@st.cache_resource
+def get_model():
+    return warmup.result("model")
+
+
+# Keyed on the workbook version so an edited file is picked up without a restart; older versions are dropped
+@st.cache_resource(max_entries=1)
+def get_raw_data(version):
+    return load_raw_data(FILE)
 
-FILE = r"IMB 529 Mission Hospital.xlsx"
-model = joblib.load("hospital_cost_model.pkl")
 
-df = pd.read_excel(FILE, sheet_name="MH-Raw Data")
+# Built once per workbook version; every gender selection is then a dictionary lookup
+@st.cache_resource(max_entries=1)
+def get_dashboard_cubes(version):
+    return build_dashboard_cubes(get_raw_data(version))
+
+
+# Holds the sort orders computed for the Table tab, shared by every session
+@st.cache_resource(max_entries=1)
+def get_table_view(version):
+    return TableView(get_raw_data(version))
+
+
+@st.cache_resource
+def get_prediction_store():
+    return PredictionStore()
+
 
 # Header with logos
 col1, col2, col3 = st.columns([1, 5, 1])
@@ -27,113 +71,173 @@ st.write("Streamlit app to display information about total costs for the Hospita
 # Create tabs with content inside each tab
 prediction_tab, dashboard_tab, table_tab = st.tabs(["Prediction", "Dashboard", "Table"])
 
-# Store predictions in session state
-if "dataframe_predictions" not in st.session_state:
-    st.session_state.dataframe_predictions = pd.DataFrame(columns=[
-        "PATIENT ID", "TIMESTAMP", "LENGTH OF STAY - ICU", "COST OF IMPLANT", "TOTAL LENGTH OF STAY", "UREA", "BMI", "COST - PREDICTED"
-    ])
+# Predictions are stored in a SQLite log shared by every session
+prediction_store = get_prediction_store()
 
 with prediction_tab:
     st.header("Prediction")
-    st.write("Please enter the following information to make a prediction:")
-
-    patient_id = st.text_input("Patient ID")
-    length_of_stay_icu = st.number_input("Length of Stay - ICU", min_value=0, max_value=100, value=5)
-    cost_of_implant = st.number_input("Cost of Implant", min_value=0.0, max_value=500000.0, value=10000.0)
-    total_length_of_stay = st.number_input("Total Length of Stay", min_value=0, max_value=365, value=10)
-    urea = st.number_input("Urea Level", min_value=0.0, max_value=300.0, value=50.0)
-    bmi = st.number_input("BMI", min_value=10.0, max_value=50.0, value=25.0)
-
-    input_data = pd.DataFrame([[patient_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                 length_of_stay_icu, cost_of_implant, total_length_of_stay, urea, bmi]],
-                              columns=["PATIENT ID", "TIMESTAMP", "LENGTH OF STAY - ICU", "COST OF IMPLANT",
-                                       "TOTAL LENGTH OF STAY", "UREA", "BMI"])
-
-    if st.button("Predict Cost"):
-        prediction = model.predict(input_data.iloc[:, 2:])[0]
-        input_data["COST - PREDICTED"] = prediction
-
-        st.session_state.dataframe_predictions = pd.concat(
-            [st.session_state.dataframe_predictions, input_data.copy()], ignore_index=True
-        )
-        st.success(f"Estimated Cost: ${prediction:,.2f}")
-
-    st.dataframe(st.session_state.dataframe_predictions)
-
-    if not st.session_state.dataframe_predictions.empty:
-        class PDFReport(FPDF):
-            def __init__(self):
-                super().__init__(orientation='L')
-
-            def header(self):
-                if os.path.exists("hospital_logo.jpg"):
-                    self.image("hospital_logo.jpg", 10, 8, 25)
-                if os.path.exists("esade_logo.jpg"):
-                    self.image("esade_logo.jpg", 265, 8, 25)
-                self.set_font("Arial", "B", 14)
-                self.cell(0, 10, "Mission Hospital - Prediction Report", ln=True, align="C")
-                self.set_font("Arial", size=10)
-                self.cell(0, 10, f"Downloaded at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
-                self.ln(5)
-
-            def prediction_table(self, df):
-                self.set_font("Arial", size=8)
-                line_height = self.font_size * 2
-                effective_page_width = self.w - 2 * self.l_margin
-                col_width = effective_page_width / len(df.columns)
-                self.set_fill_color(220, 220, 220)
-                for col in df.columns:
-                    self.cell(col_width, line_height, col, border=1, align="C", fill=True)
-                self.ln(line_height)
-                for _, row in df.iterrows():
-                    for col, val in zip(df.columns, row):
-                        if isinstance(val, float) and col.startswith("COST"):
-                            self.cell(col_width, line_height, f"${round(val, 2):,.2f}", border=1, align="C")
-                        else:
-                            self.cell(col_width, line_height, str(val), border=1, align="C")
-                    self.ln(line_height)
-
-        pdf = PDFReport()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.prediction_table(st.session_state.dataframe_predictions)
-        pdf_path = "prediction_report.pdf"
-        pdf.output(pdf_path)
-
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f, file_name="prediction_report.pdf")
+    prediction_mode = st.radio("Prediction mode", ["Single patient", "Batch upload"], horizontal=True)
+
+    if prediction_mode == "Single patient":
+        st.write("Please enter the following information to make a prediction:")
+
+        patient_id = st.text_input("Patient ID")
+        length_of_stay_icu = st.number_input("Length of Stay - ICU", min_value=0, max_value=100, value=5)
+        cost_of_implant = st.number_input("Cost of Implant", min_value=0.0, max_value=500000.0, value=10000.0)
+        total_length_of_stay = st.number_input("Total Length of Stay", min_value=0, max_value=365, value=10)
+        urea = st.number_input("Urea Level", min_value=0.0, max_value=300.0, value=50.0)
+        bmi = st.number_input("BMI", min_value=10.0, max_value=50.0, value=25.0)
+
+        input_data = pd.DataFrame([[patient_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                     length_of_stay_icu, cost_of_implant, total_length_of_stay, urea, bmi]],
+                                  columns=["PATIENT ID", "TIMESTAMP", "LENGTH OF STAY - ICU", "COST OF IMPLANT",
+                                           "TOTAL LENGTH OF STAY", "UREA", "BMI"])
+
+        if st.button("Predict Cost"):
+            model = get_model()
+            with tracer.span("model.predict", rows=1):
+                prediction = model.predict(input_data.iloc[:, 2:])[0]
+            input_data[PREDICTION_COLUMN] = prediction
+
+            prediction_store.append(input_data)
+            st.success(f"Estimated Cost: ${prediction:,.2f}")
+    else:
+        st.write("Upload a CSV or Excel file with the columns LENGTH OF STAY - ICU, COST OF IMPLANT, "
+                 "TOTAL LENGTH OF STAY, UREA and BMI (PATIENT ID is optional).")
+        uploaded_file = st.file_uploader("Patients file", type=["csv", "xlsx"])
+
+        if uploaded_file is not None:
+            try:
+                valid_rows, rejected_rows = validate_features(read_patient_file(uploaded_file))
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if not rejected_rows.empty:
+                    st.warning(f"{len(rejected_rows)} rows were skipped because of invalid values.")
+                    st.dataframe(rejected_rows)
+
+                if not valid_rows.empty and st.button("Predict Batch"):
+                    progress = st.progress(0.0)
+                    status = st.empty()
+                    batch_results = []
+                    for chunk, stats in predict_batches(get_model(), valid_rows):
+                        batch_results.append(chunk)
+                        progress.progress(stats["rows"] / stats["total"])
+                        status.write(f"Scored {stats['rows']:,} / {stats['total']:,} patients "
+                                     f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s)")
+                    batch_results = pd.concat(batch_results)
+                    prediction_store.append(batch_results.assign(TIMESTAMP=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+                    st.success(f"Scored {len(batch_results):,} patients.")
+                    st.dataframe(batch_results)
+                    st.download_button("Download predictions (CSV)", batch_results.to_csv(index=False),
+                                       file_name="batch_predictions.csv", mime="text/csv")
+
+    st.subheader("Prediction history")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        history_patient = st.text_input("Look up a patient ID (leave empty for the latest predictions)")
+    with col2:
+        history_limit = st.selectbox("Rows", [25, 50, 100, 500], index=1)
+    if history_patient:
+        shown_predictions = prediction_store.by_patient(history_patient, limit=history_limit)
+    else:
+        shown_predictions = prediction_store.recent(history_limit)
+    st.dataframe(shown_predictions)
+    st.caption(f"{prediction_store.count():,} predictions stored")
+
+    if not shown_predictions.empty:
+        from pdf_report import render_prediction_report, table_hash
+
+        # Rendered only on request; the bytes are cached on the table's content hash
+        report_key = table_hash(shown_predictions)
+        if st.button("Generate PDF Report") or st.session_state.get("report_key") == report_key:
+            st.session_state.report_key = report_key
+            pdf_bytes = render_prediction_report(shown_predictions, key=report_key)
+            st.download_button("Download PDF Report", pdf_bytes, file_name="prediction_report.pdf",
+                                mime="application/pdf")
+
+# The prediction tab is on screen; load the rest while the other tabs are built
+warmup.preload()
+df = get_raw_data(workbook_version(FILE))
 
 with dashboard_tab:
     st.header("Dashboard")
     if not df.empty:
+        import plotly.express as px
+
         gender_selection = st.radio("Show information of", ["All", "Male", "Female"], key="gender_dashboard")
 
-        if gender_selection == "Male":
-            df_filtered = df[df["GENDER"] == "M"]
-        elif gender_selection == "Female":
-            df_filtered = df[df["GENDER"] == "F"]
-        else:
-            df_filtered = df
-
-        complaint_counts = df_filtered.groupby(["KEY COMPLAINTS -CODE", "GENDER"]).size().reset_index(name="Count")
-        fig_bar = px.bar(complaint_counts, x="KEY COMPLAINTS -CODE", y="Count", color="GENDER",
-                         barmode="group", title="Distribution of Complaints by Gender",
-                         color_discrete_map={"M": "blue", "F": "pink"})
+        cube = get_dashboard_cubes(workbook_version(FILE))[gender_selection]
+
+        with tracer.span("plotly.figure", chart="complaints"):
+            fig_bar = px.bar(cube["complaints"], x="KEY COMPLAINTS -CODE", y="Count", color="GENDER",
+                             barmode="group", title="Distribution of Complaints by Gender",
+                             color_discrete_map=GENDER_COLORS)
         st.plotly_chart(fig_bar, use_container_width=True)
 
         col1, col2 = st.columns(2)
         with col1:
-            fig_box = px.box(df_filtered, x="GENDER", y="AGE", color="GENDER", title="Age Distribution by Gender",
-                         color_discrete_map={"M": "blue", "F": "pink"})
+            with tracer.span("plotly.figure", chart="age"):
+                fig_box = age_box_figure(cube["age"])
             st.plotly_chart(fig_box, use_container_width=True)
         with col2:
-            implant_counts = df_filtered.groupby(["IMPLANT USED (Y/N)", "GENDER"]).size().reset_index(name="Count")
-            fig_implant = px.bar(implant_counts, x="IMPLANT USED (Y/N)", y="Count", color="GENDER",
-                                 barmode="group", title="Need of Implant by Gender",
-                                 color_discrete_map={"M": "blue", "F": "pink"})
+            with tracer.span("plotly.figure", chart="implants"):
+                fig_implant = px.bar(cube["implants"], x="IMPLANT USED (Y/N)", y="Count", color="GENDER",
+                                     barmode="group", title="Need of Implant by Gender",
+                                     color_discrete_map=GENDER_COLORS)
             st.plotly_chart(fig_implant, use_container_width=True)
 
 with table_tab:
     st.header("Raw Hospital Data")
-    st.dataframe(df)
+    table_view = get_table_view(workbook_version(FILE))
+    all_columns = list(df.columns)
+
+    shown_columns = st.multiselect("Columns", all_columns, default=all_columns, key="table_columns")
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_by = st.selectbox("Sort by", ["(none)"] + all_columns, key="table_sort")
+    with col2:
+        sort_order = st.radio("Order", ["Asc", "Desc"], key="table_order")
+    with col3:
+        filter_column = st.selectbox("Filter column", ["(none)"] + all_columns, key="table_filter_column")
+    with col4:
+        filter_value = st.text_input("Filter value", key="table_filter_value",
+                                     help="Text columns: contains. Numeric columns: e.g. >50, <=10, 3")
+
+    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="table_page_size")
+    try:
+        positions = table_view.matching_positions(
+            sort_by=None if sort_by == "(none)" else sort_by,
+            ascending=sort_order == "Asc",
+            filter_column=None if filter_column == "(none)" else filter_column,
+            filter_value=filter_value,
+        )
+    except ValueError as e:
+        st.error(str(e))
+        positions = table_view.matching_positions(sort_by=None if sort_by == "(none)" else sort_by,
+                                                  ascending=sort_order == "Asc")
+    page_count = max(1, -(-len(positions) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="table_page")
+
+    # Only this page of the selected columns is sent to the browser
+    with tracer.span("table.page", rows=page_size):
+        table_window = table_view.page(positions, page - 1, page_size, shown_columns or all_columns)
+    st.dataframe(table_window)
+    if len(positions):
+        first_row = (page - 1) * page_size + 1
+        st.write(f"Showing rows {first_row}-{first_row + len(table_window) - 1} of {len(positions)} matching "
+                 f"(page {page} of {page_count})")
+    else:
+        st.write("No rows match the filter.")
     st.write(f"Number of rows: {df.shape[0]}")
+
+rerun_spans = tracer.end(rerun_span)
+if SHOW_TIMINGS or st.query_params.get("debug"):
+    with st.sidebar:
+        st.subheader("Timings for this rerun")
+        st.dataframe(pd.DataFrame(trace_rows(rerun_spans)), hide_index=True)
+        st.subheader("Cache hit rates (process)")
+        st.json({name: f"{rate:.0%}" for name, rate in tracer.hit_rates().items()})
+        st.download_button("Download trace (OTLP JSON)", json.dumps(to_otlp(rerun_spans, tracer.service_name)),
+                           file_name="trace.json", mime="application/json")
@@ -0,0 +1,177 @@
+"""Benchmarks for the hospital cost app's hot paths.
+
+Synthetic patients are drawn from the Mission Hospital workbook with jittered
+numeric values, so any number of realistic rows can be generated. Each case
+is timed several times and the results are written as JSON:
+
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --quick --baseline benchmark_results.json   # exit 1 on a regression
+
+Run from this folder, since the model and workbook paths are relative.
+"""
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import tracing  # noqa: F401  (puts the shared perf_tools package on sys.path)
+from perf_tools.benchmark import main as benchmark_main, measure
+
+import hospital_data
+from compact_forest import COMPACT_MODEL_FILE
+from cost_model import FEATURE_COLUMNS, MODEL_FILE, load_model, predict_frame, validate_features
+from dashboard_aggregates import build_dashboard_cubes
+from pdf_report import _render, render_prediction_report
+from prediction_store import PredictionStore
+from table_view import TableView
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+DATA_SCALES = (1, 10, 100)  # multiples of the 248 workbook rows
+PDF_ROWS = (10, 100, 1000)
+JITTER = 0.1
+
+
+def synthetic_patients(n, seed=0, base=None):
+    """n patients resampled from the workbook, numeric columns jittered by up to +/-10%."""
+    base = hospital_data.load_raw_data() if base is None else base
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    for col in df.columns:
+        if col == "SL." or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        values = df[col].to_numpy(dtype=float) * rng.uniform(1 - JITTER, 1 + JITTER, n)
+        values = np.clip(values, 0, None)
+        df[col] = np.round(values) if pd.api.types.is_integer_dtype(base[col]) else values
+        if pd.api.types.is_integer_dtype(base[col]):
+            df[col] = df[col].astype(base[col].dtype)
+    df["SL."] = np.arange(1, n + 1)
+    return df
+
+
+def bench_workbook(scales, repeat, tmp):
+    results = []
+    base = hospital_data.load_raw_data()
+    for scale in scales:
+        n = len(base) * scale
+        path = os.path.join(tmp, f"workbook_{scale}.xlsx")
+        with pd.ExcelWriter(path) as writer:
+            synthetic_patients(n, seed=scale, base=base).to_excel(writer, sheet_name=hospital_data.SHEET, index=False)
+        cache_dir = os.path.join(tmp, f"cache_{scale}")
+
+        def cold():
+            hospital_data._frames.clear()
+            hospital_data._hashes.clear()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        results.append(measure("workbook_load_excel", lambda: hospital_data.load_raw_data(path, cache_dir),
+                               repeat=max(1, repeat // 2), warmup=0, setup=cold, items=n, rows=n))
+        results.append(measure("workbook_load_parquet", lambda: hospital_data.load_raw_data(path, cache_dir),
+                               repeat=repeat, setup=hospital_data._frames.clear, items=n, rows=n))
+        results.append(measure("workbook_load_memory", lambda: hospital_data.load_raw_data(path, cache_dir),
+                               repeat=repeat, items=n, rows=n))
+    hospital_data._frames.clear()
+    return results
+
+
+def bench_model(batch_sizes, repeat):
+    results = []
+    models = {"compact": COMPACT_MODEL_FILE, "sklearn": MODEL_FILE}
+    for kind, path in models.items():
+        results.append(measure("model_load", lambda: load_model(path), repeat=max(1, repeat // 2),
+                               setup=load_model.cache_clear, model=kind))
+    patients, _ = validate_features(synthetic_patients(max(batch_sizes), seed=1)[FEATURE_COLUMNS])
+    for kind, path in models.items():
+        model = load_model(path)
+        for size in batch_sizes:
+            batch = patients.iloc[:size]
+            results.append(measure("predict", lambda: predict_frame(model, batch), repeat=repeat,
+                                   items=size, model=kind, batch=size))
+    return results
+
+
+def bench_dashboard(scales, repeat):
+    results = []
+    base = hospital_data.load_raw_data()
+    for scale in scales:
+        df = synthetic_patients(len(base) * scale, seed=scale, base=base)
+        results.append(measure("dashboard_cubes", lambda: build_dashboard_cubes(df), repeat=repeat,
+                               items=len(df), rows=len(df)))
+        view = TableView(df)
+        results.append(measure("table_page_sorted_filtered", lambda: view.page(
+            view.matching_positions("AGE", False, "COST OF IMPLANT", ">0"), 0, 50),
+            repeat=repeat, rows=len(df)))
+    return results
+
+
+def bench_pdf(row_counts, repeat):
+    results = []
+    model = load_model()
+    patients, _ = validate_features(synthetic_patients(max(row_counts), seed=2)[FEATURE_COLUMNS])
+    predictions = predict_frame(model, patients).reset_index(drop=True)
+    predictions.insert(0, "TIMESTAMP", datetime(2024, 1, 1).strftime("%Y-%m-%d %H:%M:%S"))
+    predictions.insert(0, "PATIENT ID", [f"P{i:05d}" for i in range(len(predictions))])
+    for rows in row_counts:
+        table = predictions.iloc[:rows]
+        results.append(measure("pdf_render", lambda: _render(table), repeat=max(1, repeat // 2),
+                               items=rows, rows=rows))
+        render_prediction_report(table)
+        results.append(measure("pdf_render_cached", lambda: render_prediction_report(table), repeat=repeat,
+                               rows=rows))
+    return results
+
+
+def bench_store(row_counts, repeat, tmp):
+    results = []
+    model = load_model()
+    patients, _ = validate_features(synthetic_patients(max(row_counts), seed=3)[FEATURE_COLUMNS])
+    predictions = predict_frame(model, patients).reset_index(drop=True)
+    predictions["PATIENT ID"] = [f"P{i % 500:05d}" for i in range(len(predictions))]
+    predictions["TIMESTAMP"] = "2024-01-01 00:00:00"
+    store = PredictionStore(os.path.join(tmp, "predictions.db"))
+    for rows in row_counts:
+        batch = predictions.iloc[:rows]
+        results.append(measure("store_append", lambda: store.append(batch), repeat=repeat, items=rows, rows=rows))
+    results.append(measure("store_recent", lambda: store.recent(50), repeat=repeat, rows=store.count()))
+    results.append(measure("store_by_patient", lambda: store.by_patient("P00042", limit=50), repeat=repeat,
+                           rows=store.count()))
+    store.close()
+    return results
+
+
+def run(quick=False):
+    repeat = 5 if quick else 10
+    scales = DATA_SCALES[:2] if quick else DATA_SCALES
+    batch_sizes = BATCH_SIZES[:-1] if quick else BATCH_SIZES
+    pdf_rows = PDF_ROWS[:2] if quick else PDF_ROWS
+    tmp = tempfile.mkdtemp(prefix="hospital_bench_")
+    try:
+        results = []
+        results += bench_workbook(scales, repeat, tmp)
+        results += bench_model(batch_sizes, repeat)
+        results += bench_dashboard(scales, repeat)
+        results += bench_pdf(pdf_rows, repeat)
+        results += bench_store(pdf_rows, repeat, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "suite": "hospital",
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__},
+        "results": results,
+    }
+
+
+def main(argv=None):
+    return benchmark_main(run, "Benchmark the hospital cost app", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
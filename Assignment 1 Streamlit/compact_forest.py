@@ -0,0 +1,183 @@
+"""Compact, array-backed version of the RandomForest cost model.
+
+The pickled forest is flattened into one set of NumPy node tables shared by
+all trees and saved as .npz. Loading it needs neither joblib nor scikit-learn,
+and predictions walk every (row, tree) pair at once with vectorised lookups.
+
+    python compact_forest.py export            # writes hospital_cost_model.npz and checks parity
+    python compact_forest.py verify            # re-checks an existing export against the pickle
+
+The export records the SHA-256 of the pickle it came from, so a stale export
+can be detected after the pickle is retrained.
+"""
+import argparse
+import hashlib
+import sys
+
+import numpy as np
+import pandas as pd
+
+COMPACT_MODEL_FILE = "hospital_cost_model.npz"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CompactForest:
+    """Vectorised evaluator for an exported regression forest.
+
+    Leaves point to themselves as both children, so walking max_depth levels
+    lands every row on a leaf regardless of how deep its path is. Missing
+    values follow the branch scikit-learn learned for them (missing_left).
+    """
+
+    def __init__(self, feature, threshold, missing_left, left, right, value, roots, max_depth, feature_names,
+                 source_sha256=""):
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        # SHA-256 of the pickle this forest was exported from ("" for exports that predate it)
+        self.source_sha256 = str(source_sha256)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        feature, threshold, missing_left, left, right, value, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)) & ~is_leaf)
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            value.append(tree.value[:, 0, 0])
+            offset += tree.node_count
+        return cls(
+            feature=np.concatenate(feature).astype(np.int16),
+            threshold=np.concatenate(threshold),
+            missing_left=np.concatenate(missing_left).astype(bool),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            value=np.concatenate(value),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_),
+            feature_names=list(model.feature_names_in_),
+        )
+
+    def save(self, path=COMPACT_MODEL_FILE):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, missing_left=self.missing_left, left=self.left, right=self.right,
+            value=self.value, roots=self.roots, max_depth=self.max_depth,
+            feature_names=np.asarray(self.feature_names_in_, dtype=str), source_sha256=self.source_sha256,
+        )
+
+    @classmethod
+    def load(cls, path=COMPACT_MODEL_FILE):
+        with np.load(path) as data:
+            return cls(
+                feature=data["feature"], threshold=data["threshold"], missing_left=data["missing_left"], left=data["left"], right=data["right"],
+                value=data["value"], roots=data["roots"], max_depth=data["max_depth"],
+                feature_names=list(data["feature_names"]),
+                source_sha256=data["source_sha256"] if "source_sha256" in data else "",
+            )
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)].to_numpy()
+        # scikit-learn compares float32 inputs against float64 thresholds; do the same for identical splits
+        return np.asarray(X, dtype=np.float32).astype(np.float64)
+
+    def predict(self, X, chunk_size=256):
+        X = self._as_matrix(X)
+        predictions = np.empty(len(X))
+        # Rows are walked in small chunks so the (rows x trees) node arrays stay cache-sized
+        for start in range(0, len(X), chunk_size):
+            predictions[start:start + chunk_size] = self._predict_chunk(X[start:start + chunk_size])
+        return predictions
+
+    def _predict_chunk(self, X):
+        flat = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        nodes = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            values = flat.take(row_offsets + self.feature.take(nodes))
+            go_left = (values <= self.threshold.take(nodes)) | (np.isnan(values) & self.missing_left.take(nodes))
+            next_nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+            if np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+        return self.value.take(nodes).mean(axis=1)
+
+
+def check_parity(model, compact, X, rtol=1e-9):
+    """Return the largest relative difference between the two models on X, raising if above rtol."""
+    expected = model.predict(X)
+    actual = compact.predict(X)
+    diff = float(np.max(np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0))) if len(X) else 0.0
+    if diff > rtol:
+        raise AssertionError(f"Compact forest differs from the pickled model (max relative diff {diff:.3g})")
+    return diff
+
+
+def parity_inputs(n_random=5000, seed=0):
+    """Workbook rows plus random rows spread over the observed feature ranges."""
+    # Imported here because cost_model itself loads this module
+    from cost_model import FEATURE_COLUMNS
+    from hospital_data import load_raw_data
+
+    observed = load_raw_data()[FEATURE_COLUMNS].astype(float)
+    rng = np.random.default_rng(seed)
+    low, high = observed.min().to_numpy(), observed.max().to_numpy()
+    random_rows = pd.DataFrame(rng.uniform(low, high * 1.2, size=(n_random, len(FEATURE_COLUMNS))),
+                               columns=FEATURE_COLUMNS)
+    return pd.concat([observed, random_rows], ignore_index=True)
+
+
+def main(argv=None):
+    import joblib
+    from cost_model import MODEL_FILE
+
+    parser = argparse.ArgumentParser(description="Export and verify the compact cost model")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--output", default=COMPACT_MODEL_FILE)
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    source_sha256 = file_sha256(args.model)
+    if args.command == "export":
+        compact = CompactForest.from_sklearn(model)
+        compact.source_sha256 = source_sha256
+    else:
+        compact = CompactForest.load(args.output)
+        if compact.source_sha256 != source_sha256:
+            print(f"{args.output} was not exported from {args.model}; run `python compact_forest.py export`")
+            return 1
+
+    X = parity_inputs()
+    diff = check_parity(model, compact, X)
+    print(f"Parity OK on {len(X):,} rows (max relative diff {diff:.3g})")
+
+    if args.command == "export":
+        compact.save(args.output)
+        print(f"Saved {len(compact.value):,} nodes from {len(compact.roots)} trees to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Cost prediction helpers shared by the Streamlit app and batch scoring."""
+import logging
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from compact_forest import COMPACT_MODEL_FILE, CompactForest, file_sha256
+from tracing import tracer
+
+MODEL_FILE = "hospital_cost_model.pkl"
+FEATURE_COLUMNS = ["LENGTH OF STAY - ICU", "COST OF IMPLANT", "TOTAL LENGTH OF STAY", "UREA", "BMI"]
+PREDICTION_COLUMN = "COST - PREDICTED"
+DEFAULT_CHUNK_SIZE = 2048
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_model(path=None):
+    """Load the cost model once per process.
+
+    Without a path the compact export (see compact_forest.py) is used when it
+    exists and was exported from the current pickle, falling back to the
+    scikit-learn pickle otherwise.
+    """
+    if path is None:
+        path = COMPACT_MODEL_FILE if os.path.exists(COMPACT_MODEL_FILE) else MODEL_FILE
+        if path == COMPACT_MODEL_FILE:
+            with tracer.span("compact_forest.load", path=path):
+                compact = CompactForest.load(path)
+            if not os.path.exists(MODEL_FILE) or compact.source_sha256 == file_sha256(MODEL_FILE):
+                return compact
+            logger.warning("%s was not exported from the current %s; using the pickle. "
+                           "Run `python compact_forest.py export` to refresh it.", COMPACT_MODEL_FILE, MODEL_FILE)
+            path = MODEL_FILE
+    if path.endswith(".npz"):
+        with tracer.span("compact_forest.load", path=path):
+            return CompactForest.load(path)
+    # joblib (and scikit-learn with it) is only imported when the pickle is actually used
+    import joblib
+    with tracer.span("joblib.load", path=path):
+        return joblib.load(path)
+
+
+def read_patient_file(file, name=None):
+    """Read an uploaded CSV or Excel (.xlsx) file of patients into a DataFrame."""
+    # Uploads carry their file name; the command line passes a path
+    name = name or getattr(file, "name", None) or str(file)
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".xls":
+        # Legacy .xls needs xlrd, which is not a dependency; openpyxl only reads .xlsx
+        raise ValueError("Legacy .xls files are not supported; save the file as .xlsx or .csv")
+    if extension == ".xlsx":
+        return pd.read_excel(file)
+    return pd.read_csv(file)
+
+
+def validate_features(frame):
+    """Check the five model features and split the rows into valid and rejected ones.
+
+    Raises ValueError when a feature column is missing. Rows with a missing,
+    non-numeric, infinite or negative feature value are returned separately
+    with the reason, so the caller can report them instead of failing the
+    whole batch.
+    """
+    frame = frame.rename(columns=lambda c: str(c).strip())
+    missing = [col for col in FEATURE_COLUMNS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    features = frame[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(float)
+    invalid = ~np.isfinite(features) | (features < 0)
+    bad_rows = invalid.any(axis=1)
+
+    valid = frame.loc[~bad_rows].copy()
+    valid[FEATURE_COLUMNS] = features.loc[~bad_rows]
+    rejected = frame.loc[bad_rows].copy()
+    rejected["ERROR"] = invalid.loc[bad_rows].apply(
+        lambda row: "Invalid " + ", ".join(col for col in FEATURE_COLUMNS if row[col]), axis=1
+    )
+    return valid, rejected
+
+
+def predict_batches(model, frame, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score an already validated frame chunk by chunk.
+
+    Yields (chunk, stats) where chunk is a slice of the frame with the
+    prediction column added and stats holds the running row count, elapsed
+    seconds and throughput.
+    """
+    features = frame[FEATURE_COLUMNS]
+    total = len(frame)
+    done = 0
+    start = time.perf_counter()
+    for offset in range(0, total, chunk_size):
+        chunk = frame.iloc[offset:offset + chunk_size].copy()
+        with tracer.span("model.predict", rows=len(chunk)):
+            chunk[PREDICTION_COLUMN] = model.predict(features.iloc[offset:offset + chunk_size])
+        done += len(chunk)
+        elapsed = time.perf_counter() - start
+        yield chunk, {
+            "rows": done,
+            "total": total,
+            "seconds": elapsed,
+            "rows_per_second": done / elapsed if elapsed else float("inf"),
+        }
+
+
+def predict_frame(model, frame, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score a validated frame in one go and return it with the prediction column."""
+    chunks = [chunk for chunk, _ in predict_batches(model, frame, chunk_size)]
+    if not chunks:
+        return frame.assign(**{PREDICTION_COLUMN: pd.Series(dtype=float)})
+    return pd.concat(chunks)
+
+
+def predict_records(records, model=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score a list of patient dicts from Python code.
+
+    Returns (predictions, rejected) DataFrames, as produced by validate_features.
+    """
+    model = model if model is not None else load_model()
+    valid, rejected = validate_features(pd.DataFrame.from_records(records))
+    return predict_frame(model, valid, chunk_size), rejected
@@ -0,0 +1,76 @@
+"""Precomputed aggregates for the Dashboard tab.
+
+Everything the dashboard plots is computed once per dataset version, for each
+gender selection, so switching the selection is a dictionary lookup and the
+age box plot is drawn from summary statistics instead of raw rows.
+"""
+import numpy as np
+import pandas as pd
+
+from tracing import tracer
+
+GENDER_SELECTIONS = {"All": None, "Male": "M", "Female": "F"}
+GENDER_COLORS = {"M": "blue", "F": "pink"}
+
+
+def _counts(df, column):
+    return df.groupby([column, "GENDER"], observed=True).size().reset_index(name="Count")
+
+
+def _age_summary(df):
+    """Tukey box statistics of AGE per gender, matching Plotly's default box plot."""
+    rows = []
+    for gender, ages in df.groupby("GENDER", observed=True)["AGE"]:
+        ages = ages.dropna().to_numpy()
+        if not len(ages):
+            continue
+        q1, median, q3 = np.percentile(ages, [25, 50, 75])
+        iqr = q3 - q1
+        inside = ages[(ages >= q1 - 1.5 * iqr) & (ages <= q3 + 1.5 * iqr)]
+        rows.append({
+            "GENDER": gender, "q1": q1, "median": median, "q3": q3,
+            "lowerfence": inside.min(), "upperfence": inside.max(),
+            "outliers": np.sort(ages[(ages < inside.min()) | (ages > inside.max())]),
+        })
+    return pd.DataFrame(rows, columns=["GENDER", "q1", "median", "q3", "lowerfence", "upperfence", "outliers"])
+
+
+def build_dashboard_cubes(df):
+    """Return {selection: {"complaints", "implants", "age"}} for every gender selection."""
+    with tracer.span("dashboard.aggregate", rows=len(df)):
+        complaints = _counts(df, "KEY COMPLAINTS -CODE")
+        implants = _counts(df, "IMPLANT USED (Y/N)")
+        age = _age_summary(df)
+
+    cubes = {}
+    for selection, gender in GENDER_SELECTIONS.items():
+        if gender is None:
+            cubes[selection] = {"complaints": complaints, "implants": implants, "age": age}
+        else:
+            cubes[selection] = {
+                "complaints": complaints[complaints["GENDER"] == gender].reset_index(drop=True),
+                "implants": implants[implants["GENDER"] == gender].reset_index(drop=True),
+                "age": age[age["GENDER"] == gender].reset_index(drop=True),
+            }
+    return cubes
+
+
+def age_box_figure(age_summary, title="Age Distribution by Gender"):
+    """Box plot of AGE per gender built from precomputed quartiles and fences."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for row in age_summary.itertuples(index=False):
+        color = GENDER_COLORS.get(row.GENDER)
+        fig.add_trace(go.Box(
+            x=[row.GENDER], q1=[row.q1], median=[row.median], q3=[row.q3],
+            lowerfence=[row.lowerfence], upperfence=[row.upperfence],
+            name=row.GENDER, legendgroup=row.GENDER, marker_color=color,
+        ))
+        if len(row.outliers):
+            fig.add_trace(go.Scatter(
+                x=[row.GENDER] * len(row.outliers), y=row.outliers, mode="markers",
+                legendgroup=row.GENDER, showlegend=False, marker_color=color,
+            ))
+    fig.update_layout(title=title, xaxis_title="GENDER", yaxis_title="AGE", legend_title_text="GENDER")
+    return fig
@@ -0,0 +1,85 @@
+"""Columnar cache for the Mission Hospital workbook.
+
+The Excel file is parsed once with openpyxl and stored as Parquet next to the
+app. Later loads read the Parquet file instead, and the cache is rebuilt
+whenever the workbook content changes.
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from tracing import tracer
+
+WORKBOOK = "IMB 529 Mission Hospital.xlsx"
+SHEET = "MH-Raw Data"
+CACHE_DIR = ".cache"
+CATEGORICAL_COLUMNS = ["GENDER", "KEY COMPLAINTS -CODE"]
+
+# (path, mtime, size) -> content hash, so the file is only hashed when it changes on disk
+_hashes = {}
+# version -> loaded frame, shared by every caller in the process
+_frames = {}
+
+
+def workbook_version(path=WORKBOOK):
+    """Return a short content hash of the workbook, recomputed only when its mtime or size change."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _hashes[key] = digest.hexdigest()[:16]
+    return _hashes[key]
+
+
+def cache_path(version, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"mh_raw_data_{version}.parquet")
+
+
+def _read_workbook(path):
+    with tracer.span("pandas.read_excel", path=path):
+        df = pd.read_excel(path, sheet_name=SHEET)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _write_cache(df, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Write to a temporary name first so a concurrent reader never sees a half-written file
+    tmp = f"{target}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+    for name in os.listdir(os.path.dirname(target)):
+        stale = os.path.join(os.path.dirname(target), name)
+        if name.startswith("mh_raw_data_") and name.endswith(".parquet") and stale != target:
+            os.remove(stale)
+
+
+def load_raw_data(path=WORKBOOK, cache_dir=CACHE_DIR):
+    """Return the raw hospital data, reading from the Parquet cache when it is up to date.
+
+    The same DataFrame object is handed to every caller, so treat it as read-only
+    and filter into new frames instead of modifying it in place.
+    """
+    version = workbook_version(path)
+    tracer.cache("workbook.memory", version in _frames)
+    if version in _frames:
+        return _frames[version]
+
+    target = cache_path(version, cache_dir)
+    tracer.cache("workbook.parquet", os.path.exists(target))
+    if os.path.exists(target):
+        with tracer.span("pandas.read_parquet", path=target):
+            df = pd.read_parquet(target)
+    else:
+        df = _read_workbook(path)
+        with tracer.span("pandas.to_parquet", rows=len(df)):
+            _write_cache(df, target)
+
+    _frames.clear()
+    _frames[version] = df
+    return df
@@ -0,0 +1,106 @@
+"""PDF export of the prediction history.
+
+Reports are rendered in memory and cached on a hash of the prediction table,
+so asking again for the same history returns the bytes already built, and
+concurrent users never share a file on disk.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+from fpdf import FPDF
+
+from tracing import tracer
+
+_CACHE_SIZE = 16
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class PDFReport(FPDF):
+    def __init__(self):
+        super().__init__(orientation='L')
+
+    def header(self):
+        if os.path.exists("hospital_logo.jpg"):
+            self.image("hospital_logo.jpg", 10, 8, 25)
+        if os.path.exists("esade_logo.jpg"):
+            self.image("esade_logo.jpg", 265, 8, 25)
+        self.set_font("Arial", "B", 14)
+        self.cell(0, 10, "Mission Hospital - Prediction Report", ln=True, align="C")
+        self.set_font("Arial", size=10)
+        self.cell(0, 10, f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
+        self.ln(5)
+
+    def _table_header(self, columns, col_width, line_height):
+        self.set_font("Arial", size=8)
+        for col in columns:
+            self.cell(col_width, line_height, col, border=1, align="C", fill=True)
+        self.ln(line_height)
+
+    def prediction_table(self, df):
+        self.set_font("Arial", size=8)
+        line_height = self.font_size * 2
+        effective_page_width = self.w - 2 * self.l_margin
+        col_width = effective_page_width / len(df.columns)
+        self.set_fill_color(220, 220, 220)
+        columns = [str(col) for col in df.columns]
+        self._table_header(columns, col_width, line_height)
+
+        # Format whole columns up front, then emit rows from the formatted arrays
+        formatted = [_format_column(col, df[col].to_numpy()) for col in df.columns]
+        for row in zip(*formatted):
+            if self.y + line_height > self.page_break_trigger:
+                self.add_page()
+                self._table_header(columns, col_width, line_height)
+            for val in row:
+                self.cell(col_width, line_height, val, border=1, align="C")
+            self.ln(line_height)
+
+
+def _format_column(col, values):
+    if str(col).startswith("COST"):
+        return [f"${round(val, 2):,.2f}" if isinstance(val, float) else str(val) for val in values]
+    return [str(val) for val in values]
+
+
+def table_hash(df):
+    """Content hash of a DataFrame, including its column names."""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _render(df):
+    with tracer.span("fpdf.render", rows=len(df)):
+        pdf = PDFReport()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        pdf.prediction_table(df)
+        output = pdf.output(dest="S")
+    # pyfpdf returns a latin-1 str, fpdf2 returns a bytearray
+    return output.encode("latin-1") if isinstance(output, str) else bytes(output)
+
+
+def render_prediction_report(df, key=None):
+    """Return the PDF report for df as bytes, reusing the cached copy for identical tables.
+
+    key is table_hash(df); pass it when the caller has already computed it.
+    """
+    if key is None:
+        key = table_hash(df)
+    with _cache_lock:
+        tracer.cache("pdf_report", key in _cache)
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    pdf_bytes = _render(df)
+    with _cache_lock:
+        _cache[key] = pdf_bytes
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pdf_bytes
@@ -0,0 +1,265 @@
+"""Headless cost-prediction service.
+
+Loads the model once and serves predictions over HTTP or from the command line,
+without going through the Streamlit page:
+
+    python prediction_service.py serve --port 8000
+    python prediction_service.py predict patients.csv --output predictions.csv
+
+HTTP endpoints:
+    POST /predict   body: {"records": [{...}, ...]} or a bare list of records
+    GET  /stats     request count and p50/p99 latency in milliseconds
+    GET  /health
+"""
+import argparse
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from cost_model import FEATURE_COLUMNS, PREDICTION_COLUMN, load_model, read_patient_file, validate_features
+
+
+def _json_value(value):
+    """value, with NaN and infinities (which json.loads accepts) replaced by None so responses stay valid JSON."""
+    return None if isinstance(value, float) and not math.isfinite(value) else value
+
+
+def _feature_value(value):
+    """value as a float, or None when it is missing, non-numeric, negative, NaN or infinite."""
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        value = float(value)
+    except (ValueError, OverflowError):
+        return None
+    return None if not math.isfinite(value) or value < 0 else value
+
+
+def validate_records(records):
+    """validate_features for JSON records, in plain Python so a request costs microseconds rather than milliseconds.
+
+    Returns (valid, rejected, features): the valid records with their features
+    as floats, the rejected ones with an ERROR message, and the valid rows'
+    feature matrix. Raises ValueError when a record is not an object or when
+    no record has one of the feature columns.
+    """
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError("Every record must be a JSON object")
+    records = [{str(key).strip(): _json_value(value) for key, value in record.items()} for record in records]
+    missing = [col for col in FEATURE_COLUMNS if records and not any(col in record for record in records)]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    valid, rejected, rows = [], [], []
+    for record in records:
+        values = [_feature_value(record.get(col)) for col in FEATURE_COLUMNS]
+        invalid = [col for col, value in zip(FEATURE_COLUMNS, values) if value is None]
+        if invalid:
+            rejected.append({**record, "ERROR": "Invalid " + ", ".join(invalid)})
+        else:
+            valid.append({**record, **dict(zip(FEATURE_COLUMNS, values))})
+            rows.append(values)
+    return valid, rejected, np.array(rows, dtype=float).reshape(len(rows), len(FEATURE_COLUMNS))
+
+
+class LatencyStats:
+    """Keeps the most recent request latencies and reports percentiles over them."""
+
+    def __init__(self, window=10000):
+        self._latencies = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            count = self._count
+        if not len(latencies):
+            return {"requests": count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return {"requests": count, "p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+
+
+class MicroBatcher:
+    """Merges concurrent requests into single predict calls.
+
+    Each submit() queues a block of feature rows (an array in FEATURE_COLUMNS
+    order). A worker thread waits up to
+    max_wait seconds for more blocks (or until max_rows are pending), scores
+    them with one predict call and hands each caller its own slice back.
+    """
+
+    def __init__(self, model, max_rows=4096, max_wait=0.002):
+        self.model = model
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, features):
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features):
+        return self.submit(features).result()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        rows = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            rows += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            try:
+                # One frame per batch, so the scikit-learn fallback still sees its feature names
+                features = pd.DataFrame(np.concatenate([item[0] for item in pending]), columns=FEATURE_COLUMNS)
+                predictions = self.model.predict(features) if len(features) else np.empty(0)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for block, future in pending:
+                future.set_result(predictions[offset:offset + len(block)])
+                offset += len(block)
+
+
+class PredictionService:
+    """Validates JSON records and scores them through a shared MicroBatcher."""
+
+    def __init__(self, model=None, max_rows=4096, max_wait=0.002):
+        self.model = model if model is not None else load_model()
+        self.batcher = MicroBatcher(self.model, max_rows=max_rows, max_wait=max_wait)
+        self.stats = LatencyStats()
+
+    def predict_records(self, records):
+        start = time.perf_counter()
+        valid, rejected, features = validate_records(records)
+        if valid:
+            for record, prediction in zip(valid, self.batcher.predict(features).tolist()):
+                record[PREDICTION_COLUMN] = prediction
+        self.stats.record(time.perf_counter() - start)
+        return {"predictions": valid, "rejected": rejected}
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for bursts of concurrent clients before the OS starts refusing connections
+    request_queue_size = 256
+
+
+def make_handler(service):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in one write, without Nagle delays on keep-alive connections
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, service.stats.snapshot())
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"null")
+                records = payload.get("records") if isinstance(payload, dict) else payload
+                if not isinstance(records, list):
+                    raise ValueError('Expected a list of records or {"records": [...]}')
+                self._send_json(200, service.predict_records(records))
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return PredictionHandler
+
+
+def serve(host="127.0.0.1", port=8000, service=None):
+    service = service or PredictionService()
+    server = PredictionServer((host, port), make_handler(service))
+    print(f"Serving cost predictions on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mission Hospital cost prediction service")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the HTTP prediction server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--max-batch-rows", type=int, default=4096)
+    serve_parser.add_argument("--max-wait-ms", type=float, default=2.0)
+
+    predict_parser = commands.add_parser("predict", help="Score a CSV/Excel file or JSON records from stdin")
+    predict_parser.add_argument("input", nargs="?", help="CSV or Excel file; reads JSON records from stdin if omitted")
+    predict_parser.add_argument("--output", help="CSV file to write (defaults to stdout)")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, PredictionService(max_rows=args.max_batch_rows, max_wait=args.max_wait_ms / 1000))
+        return 0
+
+    frame = read_patient_file(args.input) if args.input else pd.DataFrame.from_records(json.load(sys.stdin))
+    valid, rejected = validate_features(frame)
+    valid[PREDICTION_COLUMN] = load_model().predict(valid[FEATURE_COLUMNS]) if len(valid) else []
+    valid.to_csv(args.output or sys.stdout, index=False)
+    if len(rejected):
+        print(f"{len(rejected)} rows rejected:\n{rejected.to_string()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
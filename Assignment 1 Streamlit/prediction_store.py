@@ -0,0 +1,95 @@
+"""Persistent prediction log shared by every app session.
+
+Predictions are appended to a SQLite table indexed on PATIENT ID and
+TIMESTAMP, so each new prediction is a single insert and the UI only reads
+back the rows it shows.
+"""
+import sqlite3
+import threading
+
+import pandas as pd
+
+from tracing import tracer
+
+STORE_FILE = "predictions.db"
+
+# Column shown in the app -> column in the SQLite table
+COLUMNS = {
+    "PATIENT ID": "patient_id",
+    "TIMESTAMP": "timestamp",
+    "LENGTH OF STAY - ICU": "length_of_stay_icu",
+    "COST OF IMPLANT": "cost_of_implant",
+    "TOTAL LENGTH OF STAY": "total_length_of_stay",
+    "UREA": "urea",
+    "BMI": "bmi",
+    "COST - PREDICTED": "cost_predicted",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT,
+    timestamp TEXT NOT NULL,
+    length_of_stay_icu REAL,
+    cost_of_implant REAL,
+    total_length_of_stay REAL,
+    urea REAL,
+    bmi REAL,
+    cost_predicted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_patient ON predictions (patient_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+"""
+
+
+class PredictionStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets readers in other sessions or processes work while a prediction is being written
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, frame):
+        """Insert the rows of a prediction frame (app column names); returns the number inserted."""
+        frame = frame.reindex(columns=list(COLUMNS))
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = [
+            (None if patient_id is None else str(patient_id), str(timestamp), *values)
+            for patient_id, timestamp, *values in frame.itertuples(index=False, name=None)
+        ]
+        with tracer.span("sqlite.insert", rows=len(rows)), self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO predictions ({', '.join(COLUMNS.values())}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+        return len(rows)
+
+    def _query(self, where="", params=(), order="id DESC", limit=None):
+        sql = f"SELECT {', '.join(COLUMNS.values())} FROM predictions {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (*params, int(limit))
+        with tracer.span("sqlite.query", where=where or "all"), self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=list(COLUMNS))
+
+    def recent(self, limit=50):
+        """The latest predictions, oldest first."""
+        return self._query(limit=limit).iloc[::-1].reset_index(drop=True)
+
+    def by_patient(self, patient_id, limit=None):
+        return self._query("WHERE patient_id = ?", (str(patient_id),), order="timestamp DESC, id DESC", limit=limit)
+
+    def between(self, start, end, limit=None):
+        """Predictions with start <= TIMESTAMP < end ("YYYY-MM-DD HH:MM:SS" strings)."""
+        return self._query("WHERE timestamp >= ? AND timestamp < ?", (start, end), order="timestamp, id", limit=limit)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
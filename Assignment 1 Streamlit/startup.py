@@ -0,0 +1,32 @@
+"""Deferred loading and import-time budgets for the hospital cost app.
+
+The Warmup registry and the budget check are shared with the other app in
+perf_tools/startup.py. Import times are checked against IMPORT_BUDGETS_MS,
+each in a fresh interpreter:
+
+    python startup.py check
+"""
+import sys
+
+from tracing import tracer  # also makes the shared perf_tools package importable
+
+from perf_tools.startup import Warmup, main
+
+# Milliseconds. "app" is everything assignment_1.py imports before its first screen (mostly pandas),
+# measured after `import streamlit`; the others are the stacks it defers, measured after "app".
+IMPORT_BUDGETS_MS = {
+    "app": 600,
+    "plotly.express": 150,
+    "pdf_report": 100,
+    "joblib": 100,
+}
+# Entries that are not plain imports
+STATEMENTS = {}
+APP_IMPORTS = ("import importlib, json, os, datetime, pandas, hospital_data, cost_model, dashboard_aggregates, "
+               "table_view, prediction_store, startup")
+
+warmup = Warmup(tracer)
+
+
+if __name__ == "__main__":
+    sys.exit(main(IMPORT_BUDGETS_MS, APP_IMPORTS, STATEMENTS))
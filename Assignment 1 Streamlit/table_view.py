@@ -0,0 +1,74 @@
+"""Server-side paging, sorting, filtering and column projection for the Table tab.
+
+Only the requested page of the requested columns is materialised, so the
+browser receives a fixed-size slice however large the dataset is.
+"""
+import operator
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from tracing import tracer
+
+_COMPARISONS = {
+    ">=": operator.ge, "<=": operator.le, "!=": operator.ne,
+    ">": operator.gt, "<": operator.lt, "=": operator.eq,
+}
+_NUMERIC_FILTER = re.compile(r"^\s*(>=|<=|!=|>|<|=)?\s*(-?\d+(?:\.\d*)?)\s*$")
+
+
+class TableView:
+    """Windowed access to a read-only DataFrame.
+
+    Sort orders are computed once per (column, direction) and reused by every
+    later page request against the same frame.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def sort_order(self, column, ascending=True):
+        key = (column, ascending)
+        with self._lock:
+            tracer.cache("table.sort_order", key in self._orders)
+            if key not in self._orders:
+                values = self.df[column].reset_index(drop=True)
+                self._orders[key] = values.sort_values(ascending=ascending, kind="stable",
+                                                       na_position="last").index.to_numpy()
+            return self._orders[key]
+
+    def filter_mask(self, column, value):
+        """Boolean mask over all rows for a filter typed by the user.
+
+        Numeric columns accept comparisons such as ">50", "<= 10" or "3";
+        other columns match a case-insensitive substring.
+        """
+        values = self.df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            match = _NUMERIC_FILTER.match(value)
+            if not match:
+                raise ValueError(f"Use a number or a comparison like '>50' to filter {column}")
+            compare = _COMPARISONS[match.group(1) or "="]
+            return compare(values.to_numpy(), float(match.group(2)))
+        return values.astype(str).str.contains(value, case=False, regex=False).to_numpy()
+
+    def matching_positions(self, sort_by=None, ascending=True, filter_column=None, filter_value=""):
+        """Row positions passing the filter, in display order."""
+        if sort_by:
+            positions = self.sort_order(sort_by, ascending)
+        else:
+            positions = np.arange(len(self.df))
+        if filter_column and filter_value.strip():
+            mask = self.filter_mask(filter_column, filter_value.strip())
+            positions = positions[mask[positions]]
+        return positions
+
+    def page(self, positions, page=0, page_size=50, columns=None):
+        """Materialise one page of the given row positions, projected to columns."""
+        page_positions = positions[page * page_size:(page + 1) * page_size]
+        column_positions = self.df.columns.get_indexer(columns) if columns else slice(None)
+        return self.df.iloc[page_positions, column_positions]
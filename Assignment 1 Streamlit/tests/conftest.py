@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live one level up and read their data files relative to that folder
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture
+def in_app_dir(monkeypatch):
+    monkeypatch.chdir(APP_DIR)
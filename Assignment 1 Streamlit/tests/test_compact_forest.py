@@ -0,0 +1,51 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import cost_model
+from compact_forest import COMPACT_MODEL_FILE, CompactForest, check_parity, file_sha256, parity_inputs
+from cost_model import FEATURE_COLUMNS, MODEL_FILE, load_model
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def models():
+    model = joblib.load(os.path.join(APP_DIR, MODEL_FILE))
+    compact = CompactForest.load(os.path.join(APP_DIR, COMPACT_MODEL_FILE))
+    return model, compact
+
+
+def test_compact_model_matches_pickle(models, in_app_dir):
+    X = parity_inputs()
+    # The workbook has patients without a UREA value; both models must route them the same way
+    assert X["UREA"].isna().any()
+    check_parity(*models, X)
+
+
+def test_compact_model_matches_pickle_with_missing_urea(models):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.uniform(0, 100, size=(500, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    X.loc[::2, "UREA"] = np.nan
+    check_parity(*models, X)
+
+
+def test_compact_model_was_exported_from_current_pickle(models):
+    assert models[1].source_sha256 == file_sha256(os.path.join(APP_DIR, MODEL_FILE))
+
+
+def test_load_model_falls_back_to_pickle_for_stale_export(models, in_app_dir, monkeypatch, tmp_path, caplog):
+    stale = models[1]
+    stale_path = str(tmp_path / "stale.npz")
+    CompactForest(stale.feature, stale.threshold, stale.missing_left, stale.left, stale.right, stale.value,
+                  stale.roots, stale.max_depth, stale.feature_names_in_, source_sha256="0" * 64).save(stale_path)
+    monkeypatch.setattr(cost_model, "COMPACT_MODEL_FILE", stale_path)
+    load_model.cache_clear()
+    try:
+        assert not isinstance(load_model(), CompactForest)
+    finally:
+        load_model.cache_clear()
+    assert "was not exported from the current" in caplog.text
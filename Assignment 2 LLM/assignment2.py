@@ -1,139 +1,63 @@
 import streamlit as st
-import cohere
-import pandas as pd
-import requests
-import pydeck as pdk
 from dotenv import load_dotenv
+import importlib
 import os
-from fpdf import FPDF
+import json
 from datetime import datetime
-from PIL import Image
-import urllib.request
+from llm_cache import CachedChat
+from matching import LLM_MODEL, explain_matches_prompt, gap_analysis_prompt, keyword_matches
+from tracing import to_otlp, trace_rows, tracer
+from startup import warmup
 
 
 load_dotenv()
 api_key = os.getenv("COHERE_API_KEY")
+# Set SHOW_TIMINGS=1 or open the app with ?debug=1 to see where each rerun spends its time
+SHOW_TIMINGS = bool(os.getenv("SHOW_TIMINGS"))
+
+# Everything below, including the cached resources on a cold start, is traced as one rerun
+rerun_span = tracer.start_trace("streamlit.rerun")
+
+
+def build_llm():
+    import cohere
+    return CachedChat(cohere.Client(api_key, timeout=60))
+
+
+def warm_program_index():
+    from catalog import CATALOG_FILE, catalog_version
+    get_program_index(catalog_version(CATALOG_FILE))
+
+
+# Nothing heavy is imported or built until a page needs it; after the first screen is sent,
+# the rest is warmed on a background thread. The semantic index is left to first use.
+warmup.register("llm", build_llm)
+warmup.register("program_index", warm_program_index)
+warmup.register("map", lambda: importlib.import_module("pydeck"))
+warmup.register("countries", lambda: importlib.import_module("country_store").get_store())
+warmup.register("pdf", lambda: importlib.import_module("pdf_report"))
+
+
+# Cohere behind a persistent response cache shared by all sessions
+@st.cache_resource
+def get_llm():
+    return warmup.result("llm")
+
+
+# Shared by all sessions and rebuilt when programs.json changes; only the current version is kept
+@st.cache_resource(max_entries=1)
+def get_program_index(version):
+    from catalog import CATALOG_FILE, load_catalog
+    from program_index import ProgramIndex
+    return ProgramIndex(load_catalog(CATALOG_FILE))
+
+
+@st.cache_resource(max_entries=1)
+def get_semantic_index(version):
+    from catalog import CATALOG_FILE, load_catalog
+    from semantic_search import SemanticIndex
+    return SemanticIndex(load_catalog(CATALOG_FILE))
 
-# Initialize Cohere
-co = cohere.Client(api_key) 
-
-# QS ranking sample
-qs_ranking = {
-    "ESADE": 151,
-    "Nova Tech Business School": 500,
-    "Berlin Tech University": 220,
-    "Milano School of Innovation": 310
-}
-
-# Simulated data
-program_data = [
-    {
-        "university": "ESADE",
-        "programs": [
-            {
-                "name": "Master in Data Analytics and Artificial Intelligence",
-                "description": "Develop the skills to analyze data and apply insights using Python, AI tools, and big data platforms like AWS and Spark.",
-                "area": "Data",
-                "cost": "35,000.00 euros",
-                "location": "San Cugat del Valles, Barcelona",
-                "country": "Spain",
-                "scholarship": "Yes, depends",
-                "modality": "In person",
-                "courses": [
-                    "Artificial Intelligence I", "Business in Society", "Cloud Computing",
-                    "Python for Data Science", "Artificial Intelligence II",
-                    "Data Analytics with R", "Thinking with Data"
-                ]
-            },
-            {
-                "name": "Master in Innovation & Entrepreneurship",
-                "description": "Launch your own startup or drive innovation within a company using strategy, marketing, and creative design tools.",
-                "area": "Business",
-                "cost": "35,000.00 euros",
-                "location": "San Cugat del Valles, Barcelona",
-                "country": "Spain",
-                "scholarship": "Yes, depends",
-                "modality": "In person",
-                "courses": [
-                    "Business in Society", "Creative Thinking", "Entrepreneurship",
-                    "Innovation Management", "Finance for Entrepreneurs",
-                    "Marketing for Entrepreneurs"
-                ]
-            }
-        ]
-    },
-    {
-        "university": "Nova Tech Business School",
-        "programs": [
-            {
-                "name": "Master in Data Intelligence and AI Strategy",
-                "description": "Focus on leveraging data, AI platforms, and analytics to drive innovation and strategic decisions.",
-                "area": "Data",
-                "cost": "35,000.00 euros",
-                "location": "Madrid",
-                "country": "Spain",
-                "scholarship": "Yes, depends",
-                "modality": "In person",
-                "courses": [
-                    "Artificial Intelligence II", "Data Visualization", "Cloud Computing",
-                    "Python for Data Science", "AI for Decision Making", "Big Data Infrastructure"
-                ]
-            },
-            {
-                "name": "Master in Creative Innovation & Startup Development",
-                "description": "Train to design, fund, and grow new business models with a strong focus on entrepreneurial thinking and innovation ecosystems.",
-                "area": "Business",
-                "cost": "35,000.00 euros",
-                "location": "Madrid",
-                "country": "Spain",
-                "scholarship": "Yes, depends",
-                "modality": "In person",
-                "courses": [
-                    "Entrepreneurship", "Creative Thinking", "Design Thinking",
-                    "Finance for Entrepreneurs", "Startup Marketing", "Innovation Management"
-                ]
-            }
-        ]
-    },
-    {
-        "university": "Berlin Tech University",
-        "programs": [
-            {
-                "name": "MSc in Intelligent Systems and Data Science",
-                "description": "An interdisciplinary program focused on AI systems, data engineering, and computational logic for smart environments.",
-                "area": "Data",
-                "cost": "Free (tuition-free)",
-                "location": "Berlin",
-                "country": "Germany",
-                "scholarship": "Limited",
-                "modality": "In person",
-                "courses": [
-                    "Machine Learning", "Big Data Systems", "AI & Society",
-                    "Deep Learning", "Cloud Architecture", "Data Ethics"
-                ]
-            }
-        ]
-    },
-    {
-        "university": "Milano School of Innovation",
-        "programs": [
-            {
-                "name": "Master in Design Thinking and Digital Strategy",
-                "description": "Equips students with the mindset and skills to lead design-driven innovation in tech-oriented organizations.",
-                "area": "Business",
-                "cost": "19,500.00 euros",
-                "location": "Milan",
-                "country": "Italy",
-                "scholarship": "Yes",
-                "modality": "Hybrid",
-                "courses": [
-                    "Design Thinking", "Strategic Innovation", "UX & Digital Interfaces",
-                    "Agile Management", "Startup Launch Lab", "Behavioral Economics"
-                ]
-            }
-        ]
-    }
-]
 
 # Streamlit config
 st.set_page_config(page_title="Master Finder App", page_icon="🎓")
@@ -150,180 +74,142 @@ if "selected_countries" not in st.session_state:
 if "current_page" not in st.session_state:
     st.session_state.current_page = "Program Finder"
 
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists("master_finder_app.png"):
-            self.image("master_finder_app.png", 10, 5, 20)
-        self.set_font("Arial", "B", 10)
-        self.set_fill_color(240, 240, 240)
-        self.cell(0, 8, "Master's Program Recommendation Report", ln=True, align="C", fill=True)
-        self.ln(10)
-
-    def program_table(self, df):
-        self.set_font("Arial", size=6)
-        col_width = self.w / len(df.columns) - 2
-        self.ln(2)
-        for col in df.columns:
-            self.cell(col_width, 5, str(col).encode("latin-1", errors="replace").decode("latin-1"), border=1, align="C")
-        self.ln()
-        for _, row in df.iterrows():
-            for val in row:
-                val = str(val).encode("latin-1", errors="replace").decode("latin-1")
-                self.cell(col_width, 5, val, border=1, align="C")
-            self.ln()
-
-    def country_info(self, country_infos):
-        self.ln(3)
-        self.set_font("Arial", "B", 8)
-        self.cell(0, 6, "Country Information", ln=True)
-        self.set_font("Arial", size=6)
-        for country, info in country_infos.items():
-            self.ln(2)
-            self.cell(0, 4, f"- {country}".encode("latin-1", errors="replace").decode("latin-1"), ln=True)
-            for key, val in info.items():
-                line = f"   {key}: {val}"
-                self.cell(0, 4, line.encode("latin-1", errors="replace").decode("latin-1"), ln=True)
-
-def extract_keywords_prompt(user_input):
-    return f"""
-    From the following user profile, extract key interests, preferred study fields (e.g., Data, Business), and career motivations.
-    User profile:
-    {user_input}
-    Return the result as a comma-separated list of keywords.
-    """
-
-def explain_matches_prompt(user_input, match_names):
-    return f"""
-    User background: {user_input}
-    Programs matched: {match_names}
-    Based on the user's interests and academic goals, explain in 2–3 sentences per program why each one would be a suitable match.
-    """
-
-def gap_analysis_prompt(user_input):
-    return f"""
-    User profile: {user_input}
-    Based on this profile, are there any types of master's programs or study areas NOT listed above that could still be a good fit? Suggest a few ideas and why.
-    """
-
 if st.session_state.current_page == "Program Finder":
     min_rank, max_rank = st.slider("Filter by QS World Ranking (lower is better)", 1, 1000, (1, 1000))
     user_input = st.text_area("Describe your background and interests:", placeholder="e.g. I want to launch a startup")
+    matching_mode = st.radio("Matching", ["Keywords (LLM)", "Semantic (offline)"], horizontal=True,
+                             help="Semantic matching compares your profile with each program locally, "
+                                  "without the keyword-extraction LLM call.")
 
     if user_input:
+        from catalog import CATALOG_FILE, catalog_version
+        version = catalog_version(CATALOG_FILE)
+        llm = get_llm()
+
+        # Only the matching step sits behind the spinner; LLM text streams in afterwards
         with st.spinner("Finding matching programs..."):
-            keywords_prompt = extract_keywords_prompt(user_input)
-            keywords = co.chat(model="command-r-plus", message=keywords_prompt).text.strip().lower().split(",")
-
-            matches = []
-            for uni in program_data:
-                for prog in uni["programs"]:
-                    text = (prog["name"] + prog["description"] + " ".join(prog["courses"])).lower()
-                    rank = qs_ranking.get(uni["university"], 1001)
-                    if any(k.strip() in text for k in keywords) and min_rank <= rank <= max_rank:
-                        prog_copy = prog.copy()
-                        prog_copy["university"] = uni["university"]
-                        prog_copy["qs_rank"] = rank
-                        matches.append(prog_copy)
-
-            if matches:
-                df = pd.DataFrame(matches)[["university", "name", "area", "cost", "location", "modality", "scholarship", "qs_rank", "country"]]
-
-                match_names = [f"{m['name']} at {m['university']}" for m in matches]
-                explain_prompt = explain_matches_prompt(user_input, match_names)
-                explanation = co.chat(model="command-r-plus", message=explain_prompt).text.strip()
-
-                st.subheader("🔍 Suggested Programs")
-                st.write(explanation)
-                st.dataframe(df)
-
-                if st.checkbox("🔧 Show additional suggestions"):
-                    gap_prompt = gap_analysis_prompt(user_input)
-                    gap_response = co.chat(model="command-r-plus", message=gap_prompt)
-                    st.subheader("💡 Other Possible Program Ideas")
-                    st.write(gap_response.text.strip())
-
-                st.subheader("📍 Locations Map")
-                map_df = df.copy()
-                map_df["lat"] = map_df["location"].map({
-                    "San Cugat del Valles, Barcelona": 41.4722,
-                    "Madrid": 40.4168,
-                    "Berlin": 52.52,
-                    "Milan": 45.4642
-                })
-                map_df["lon"] = map_df["location"].map({
-                    "San Cugat del Valles, Barcelona": 2.0812,
-                    "Madrid": -3.7038,
-                    "Berlin": 13.405,
-                    "Milan": 9.19
-                })
-                map_df["tooltip"] = map_df["name"] + " - " + map_df["university"]
-
-                st.pydeck_chart(pdk.Deck(
+            if matching_mode == "Semantic (offline)":
+                index = get_semantic_index(version)
+                results = index.search(user_input, min_rank, max_rank)
+            else:
+                index = get_program_index(version)
+                results = keyword_matches(llm, index, user_input, min_rank, max_rank)
+
+        # Program catalog, rankings and geocodes as read from programs.json for this index
+        catalog = index.catalog
+        # Matches are catalog row indices; only these rows are turned into a DataFrame
+        matches = [doc_id for doc_id, score in results]
+
+        if matches:
+            df = catalog.frame(matches)
+
+            match_names = [f"{name} at {university}" for name, university in zip(df["name"], df["university"])]
+            explain_prompt = explain_matches_prompt(user_input, match_names)
+
+            st.subheader("🔍 Suggested Programs")
+            explanation_slot = st.empty()
+            st.dataframe(df, column_config={"cost": st.column_config.NumberColumn("cost (EUR)", format="%.0f")})
+
+            show_gap = st.checkbox("🔧 Show additional suggestions")
+            gap_slot = st.empty()
+            if show_gap:
+                # Fetched in the background while the explanation streams
+                gap_prompt = gap_analysis_prompt(user_input)
+                llm.prefetch(LLM_MODEL, gap_prompt)
+
+            st.subheader("📍 Locations Map")
+            import pydeck as pdk
+            map_df = catalog.frame(matches, ["name", "university", "lat", "lon"]).dropna(subset=["lat", "lon"])
+            map_df["tooltip"] = map_df["name"] + " - " + map_df["university"]
+
+            with tracer.span("pydeck.figure", points=len(map_df)):
+                deck = pdk.Deck(
                     initial_view_state=pdk.ViewState(latitude=map_df["lat"].mean(), longitude=map_df["lon"].mean(), zoom=4),
                     layers=[pdk.Layer("ScatterplotLayer", data=map_df, get_position='[lon, lat]', get_radius=40000, get_color='[200, 30, 0, 160]', pickable=True)],
                     tooltip={"text": "{tooltip}"}
-                ))
+                )
+            st.pydeck_chart(deck)
+
+            if st.button("🌐 See country details", key="country_details_btn"):
+                st.session_state.selected_countries = list(df["country"].unique())
+                st.session_state.current_page = "Country Info"
+                st.experimental_rerun()
 
-                if st.button("🌐 See country details", key="country_details_btn"):
-                    st.session_state.selected_countries = list(df["country"].unique())
-                    st.session_state.current_page = "Country Info"
-                    st.experimental_rerun()
+            if st.button("🖨️ Download PDF Report"):
+                from country_store import get_store as get_country_store
+                from fetch_pipeline import format_country_info
+                from pdf_report import PDF
 
-                if st.button("🖨️ Download PDF Report"):
+                with tracer.span("fpdf.render", rows=len(df)):
                     pdf = PDF(orientation="L")
                     pdf.add_page()
                     pdf.program_table(df)
 
-                    countries = list(df["country"].unique())
-                    country_infos = {}
-                    for country in countries:
-                        try:
-                            url = f"https://restcountries.com/v3.1/name/{country.lower()}?fullText=true"
-                            res = requests.get(url)
-                            data = res.json()[0]
-                            info = {
-                                "Capital": data.get("capital", ["N/A"])[0],
-                                "Population": f"{data.get('population', 0):,}",
-                                "Region": data.get("region", "N/A"),
-                                "Currency": list(data.get("currencies", {}).keys())[0],
-                                "Languages": ", ".join(data.get("languages", {}).values())
-                            }
-                            country_infos[country] = info
-                        except:
-                            continue
+                countries = list(df["country"].unique())
+                country_infos = {
+                    country: format_country_info(info)
+                    for country, info in get_country_store().get_many(countries).items() if info is not None
+                }
 
-                    pdf.add_page()
-                    pdf.country_info(country_infos)
+                pdf.add_page()
+                pdf.country_info(country_infos)
 
-                    filename = f"master_finder_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                filename = f"master_finder_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                with tracer.span("fpdf.output"):
                     pdf.output(filename)
-                    st.success(f"PDF report saved as `{filename}`")
-            else:
-                st.warning("No matches found. Try adjusting your profile.")
+                st.success(f"PDF report saved as `{filename}`")
+
+            # The table, map and buttons are already on screen; fill in the LLM text as it arrives
+            try:
+                with explanation_slot.container():
+                    st.write_stream(llm.stream(LLM_MODEL, explain_prompt))
+            except Exception as e:
+                explanation_slot.error(f"Could not generate the explanation: {e}")
+
+            if show_gap:
+                with gap_slot.container():
+                    st.subheader("💡 Other Possible Program Ideas")
+                    try:
+                        st.write_stream(llm.stream(LLM_MODEL, gap_prompt))
+                    except Exception as e:
+                        st.error(f"Could not generate suggestions: {e}")
+        else:
+            st.warning("No matches found. Try adjusting your profile.")
 
 elif st.session_state.current_page == "Country Info":
     st.title("🌍 Country Information")
+    from country_store import get_store as get_country_store
+    from fetch_pipeline import format_country_info
+
+    # Served from the bundled snapshot / in-memory cache; stale entries refresh in the background
+    country_data = get_country_store().get_many(st.session_state.selected_countries)
     for country in st.session_state.selected_countries:
         st.markdown("---")
         st.subheader(f"🇺🇳 Info for {country}")
-        try:
-            url = f"https://restcountries.com/v3.1/name/{country.lower().strip()}?fullText=true"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()[0]
-                st.write(f"**Capital**: {data.get('capital', ['N/A'])[0]}")
-                st.write(f"**Population**: {data.get('population', 'N/A'):,}")
-                st.write(f"**Region**: {data.get('region', 'N/A')}")
-                currencies = list(data.get('currencies', {}).keys())
-                st.write(f"**Currency**: {currencies[0] if currencies else 'N/A'}")
-                languages = data.get('languages', {})
-                st.write(f"**Languages**: {', '.join(languages.values()) if languages else 'N/A'}")
-                st.image(data.get('flags', {}).get('png', ''), caption=f"Flag of {country}")
-            else:
-                st.error("Data not available.")
-        except Exception as e:
-            st.error(f"Error: {e}")
+        info = country_data.get(country)
+        if info is None:
+            st.error("Data not available.")
+            continue
+        for label, value in format_country_info(info).items():
+            st.write(f"**{label}**: {value}")
+        if info["flag"]:
+            st.image(info["flag"], caption=f"Flag of {country}")
 
     if st.button("⬅️ Back to program finder"):
         st.session_state.current_page = "Program Finder"
         st.experimental_rerun()
+
+# The page is on screen; load whatever the next interaction may need
+warmup.preload(["llm", "program_index", "map", "countries", "pdf"])
+
+rerun_spans = tracer.end(rerun_span)
+if SHOW_TIMINGS or st.query_params.get("debug"):
+    import pandas as pd
+
+    with st.sidebar:
+        st.subheader("Timings for this rerun")
+        st.dataframe(pd.DataFrame(trace_rows(rerun_spans)), hide_index=True)
+        st.subheader("Cache hit rates (process)")
+        st.json({name: f"{rate:.0%}" for name, rate in tracer.hit_rates().items()})
+        st.download_button("Download trace (OTLP JSON)", json.dumps(to_otlp(rerun_spans, tracer.service_name)),
+                           file_name="trace.json", mime="application/json")
@@ -0,0 +1,212 @@
+"""Benchmarks for the Master Finder's hot paths.
+
+Synthetic catalogs of any size are generated by recombining the words,
+locations and countries of programs.json. The LLM is replaced by
+stub_client.StubCohereClient, so matching is timed without network calls.
+Results are written as JSON:
+
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --quick --baseline benchmark_results.json   # exit 1 on a regression
+
+Run from this folder, since the catalog and logo paths are relative.
+"""
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import tracing  # noqa: F401  (puts the shared perf_tools package on sys.path)
+from perf_tools.benchmark import main as benchmark_main, measure
+
+from catalog import CATALOG_FILE, load_catalog
+from fetch_pipeline import format_country_info
+from llm_cache import CachedChat
+from matching import LLM_MODEL, explain_matches_prompt, keyword_matches
+from pdf_report import PDF
+from program_index import ProgramIndex
+from semantic_search import SemanticIndex
+from stub_client import StubCohereClient
+
+CATALOG_SIZES = (1000, 5000, 20000)
+PDF_ROWS = (10, 100, 1000)
+PROGRAMS_PER_UNIVERSITY = 10
+PROFILES = [
+    "I studied economics and want to move into data science and machine learning",
+    "Engineer interested in launching a startup and learning entrepreneurship",
+    "Marketing background, curious about digital business and innovation strategy",
+    "I love finance, investment banking and quantitative analysis",
+    "Looking for sustainability, energy and environmental management programs",
+]
+STREAM_LATENCY = 0.05
+STREAM_TOKEN_DELAY = 0.002
+
+
+def synthetic_catalog(n_programs, seed=0, path=CATALOG_FILE):
+    """A programs.json-style dict with n_programs programs built from the real catalog's vocabulary."""
+    with open(path, encoding="utf-8") as f:
+        base = json.load(f)
+    rng = np.random.default_rng(seed)
+    programs = [prog for uni in base["universities"] for prog in uni["programs"]]
+    words = sorted({w for prog in programs for w in prog["description"].split()})
+    courses = sorted({c for prog in programs for c in prog.get("courses", [])})
+    names = [prog["name"] for prog in programs]
+    places = [(prog["location"], prog["country"]) for prog in programs]
+    areas = sorted({prog["area"] for prog in programs})
+
+    universities = []
+    for u in range((n_programs + PROGRAMS_PER_UNIVERSITY - 1) // PROGRAMS_PER_UNIVERSITY):
+        location, country = places[rng.integers(len(places))]
+        uni_programs = []
+        for _ in range(min(PROGRAMS_PER_UNIVERSITY, n_programs - u * PROGRAMS_PER_UNIVERSITY)):
+            uni_programs.append({
+                "name": f"{names[rng.integers(len(names))]} {rng.integers(1000)}",
+                "description": " ".join(rng.choice(words, 20)),
+                "area": areas[rng.integers(len(areas))],
+                "cost": f"{rng.integers(5, 60) * 1000:,}.00 euros",
+                "location": location,
+                "country": country,
+                "scholarship": "Yes, depends",
+                "modality": "In person",
+                "courses": list(rng.choice(courses, 6, replace=False)),
+            })
+        universities.append({"university": f"University {u}", "programs": uni_programs})
+    rankings = {uni["university"]: int(rng.integers(1, 1001)) for uni in universities}
+    return {"rankings": rankings, "locations": base["locations"], "universities": universities}
+
+
+def bench_catalog(sizes, repeat, tmp):
+    results = []
+    for size in sizes:
+        path = os.path.join(tmp, f"programs_{size}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(synthetic_catalog(size, seed=size), f)
+        # Touching the file forces load_catalog to parse it again
+        results.append(measure("catalog_load", lambda: load_catalog(path), repeat=repeat,
+                               setup=lambda: os.utime(path, ns=(time.time_ns(), time.time_ns())),
+                               items=size, programs=size))
+        catalog = load_catalog(path)
+        results.append(measure("keyword_index_build", lambda: ProgramIndex(catalog), repeat=max(1, repeat // 2),
+                               items=size, programs=size))
+        vectors = os.path.join(tmp, f"vectors_{size}")
+        results.append(measure("semantic_index_build", lambda: SemanticIndex(catalog, cache_dir=vectors),
+                               repeat=max(1, repeat // 2), setup=lambda: shutil.rmtree(vectors, ignore_errors=True),
+                               items=size, programs=size))
+        results.append(measure("semantic_index_load", lambda: SemanticIndex(catalog, cache_dir=vectors),
+                               repeat=repeat, programs=size))
+    return results
+
+
+def bench_matching(sizes, repeat, tmp):
+    """The matching step of the Program Finder: LLM keywords (stubbed), search, then the result frame."""
+    results = []
+    for size in sizes:
+        catalog = load_catalog(os.path.join(tmp, f"programs_{size}.json"))
+        index = ProgramIndex(catalog)
+        semantic = SemanticIndex(catalog, cache_dir=os.path.join(tmp, f"vectors_{size}"))
+        client = StubCohereClient()
+        profiles = iter(range(10 ** 9))
+
+        def keyword_miss():
+            # New profiles every call, so the LLM cache never answers
+            for profile in PROFILES:
+                profile = f"{profile} {next(profiles)}"
+                catalog.frame([doc_id for doc_id, _ in keyword_matches(llm, index, profile)])
+
+        def keyword_hit():
+            for profile in PROFILES:
+                catalog.frame([doc_id for doc_id, _ in keyword_matches(llm, index, profile)])
+
+        def semantic_match():
+            for profile in PROFILES:
+                catalog.frame([doc_id for doc_id, _ in semantic.search(profile)])
+
+        llm = CachedChat(client, path=os.path.join(tmp, f"llm_{size}.db"))
+        results.append(measure("match_keywords_uncached", keyword_miss, repeat=repeat, items=len(PROFILES),
+                               programs=size))
+        results.append(measure("match_keywords_cached", keyword_hit, repeat=repeat, items=len(PROFILES),
+                               programs=size))
+        results.append(measure("match_semantic", semantic_match, repeat=repeat, items=len(PROFILES),
+                               programs=size))
+    return results
+
+
+def bench_explanation(repeat, tmp):
+    """Time to first content for the explanation, blocking versus streamed, against a stub with fixed latency."""
+    client = StubCohereClient(latency=STREAM_LATENCY, token_delay=STREAM_TOKEN_DELAY,
+                              responder=lambda message: "This program fits your profile well. " * 20)
+    llm = CachedChat(client, path=os.path.join(tmp, "llm_stream.db"))
+    prompts = iter(range(10 ** 9))
+
+    def blocking():
+        llm.chat(LLM_MODEL, explain_matches_prompt(PROFILES[0], [next(prompts)]))
+
+    def first_chunk():
+        stream = llm.stream(LLM_MODEL, explain_matches_prompt(PROFILES[0], [next(prompts)]))
+        next(stream)
+        stream.close()
+
+    params = {"latency_s": STREAM_LATENCY, "token_delay_s": STREAM_TOKEN_DELAY}
+    return [
+        measure("explanation_blocking", blocking, repeat=repeat, warmup=0, **params),
+        measure("explanation_first_chunk", first_chunk, repeat=repeat, warmup=0, **params),
+    ]
+
+
+def bench_pdf(row_counts, repeat, tmp, catalog_size):
+    results = []
+    catalog = load_catalog(os.path.join(tmp, f"programs_{catalog_size}.json"))
+    info = {"capital": "Madrid", "population": 47351567, "region": "Europe", "currency": "EUR",
+            "languages": ["Spanish"]}
+    for rows in row_counts:
+        df = catalog.frame(np.arange(rows) % len(catalog))
+        country_infos = {country: format_country_info(info) for country in df["country"].unique()}
+
+        def render():
+            pdf = PDF(orientation="L")
+            pdf.add_page()
+            pdf.program_table(df)
+            pdf.add_page()
+            pdf.country_info(country_infos)
+            pdf.output(dest="S")
+
+        results.append(measure("pdf_render", render, repeat=max(1, repeat // 2), items=rows, rows=rows))
+    return results
+
+
+def run(quick=False):
+    repeat = 5 if quick else 10
+    sizes = CATALOG_SIZES[:2] if quick else CATALOG_SIZES
+    pdf_rows = PDF_ROWS[:2] if quick else PDF_ROWS
+    tmp = tempfile.mkdtemp(prefix="master_finder_bench_")
+    try:
+        results = []
+        results += bench_catalog(sizes, repeat, tmp)
+        results += bench_matching(sizes, repeat, tmp)
+        results += bench_explanation(repeat, tmp)
+        results += bench_pdf(pdf_rows, repeat, tmp, sizes[0])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "suite": "master_finder",
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__},
+        "results": results,
+    }
+
+
+def main(argv=None):
+    return benchmark_main(run, "Benchmark the Master Finder", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
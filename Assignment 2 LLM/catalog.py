@@ -0,0 +1,134 @@
+"""Program catalog loaded from programs.json into compact columnar arrays.
+
+Universities, countries and locations are stored once and referenced by
+integer ids. Costs are parsed to numbers (EUR), and every other program
+field is kept as one array or list per column. Match results are row
+indices into these columns, and a DataFrame is only built for the rows
+that are shown.
+"""
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from tracing import tracer
+
+CATALOG_FILE = "programs.json"
+MISSING_RANK = 1001
+DISPLAY_COLUMNS = ["university", "name", "area", "cost", "location", "modality", "scholarship", "qs_rank", "country"]
+
+_AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def parse_cost(text):
+    """'35,000.00 euros' -> 35000.0, 'Free (tuition-free)' -> 0.0, anything else -> NaN."""
+    if text is None:
+        return np.nan
+    if isinstance(text, (int, float)):
+        return float(text)
+    if "free" in text.lower():
+        return 0.0
+    match = _AMOUNT.search(text)
+    return float(match.group().replace(",", "")) if match else np.nan
+
+
+class _Vocabulary:
+    """Assigns consecutive integer ids to distinct values."""
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def id(self, value):
+        if value not in self._ids:
+            self._ids[value] = len(self.values)
+            self.values.append(value)
+        return self._ids[value]
+
+
+class Catalog:
+    __slots__ = (
+        "universities", "countries", "locations", "location_lat", "location_lon",
+        "university_id", "country_id", "location_id", "qs_rank", "cost",
+        "name", "description", "area", "scholarship", "modality", "courses",
+    )
+
+    def __init__(self, data):
+        universities, countries, locations = _Vocabulary(), _Vocabulary(), _Vocabulary()
+        rankings = data.get("rankings", {})
+        columns = {key: [] for key in ("university_id", "country_id", "location_id", "qs_rank", "cost", "name",
+                                        "description", "area", "scholarship", "modality", "courses")}
+        for uni in data["universities"]:
+            uni_id = universities.id(uni["university"])
+            rank = rankings.get(uni["university"], MISSING_RANK)
+            for prog in uni["programs"]:
+                columns["university_id"].append(uni_id)
+                columns["country_id"].append(countries.id(prog["country"]))
+                columns["location_id"].append(locations.id(prog["location"]))
+                columns["qs_rank"].append(rank)
+                columns["cost"].append(parse_cost(prog.get("cost")))
+                for key in ("name", "description", "area", "scholarship", "modality"):
+                    columns[key].append(prog.get(key, ""))
+                columns["courses"].append(tuple(prog.get("courses", ())))
+
+        self.universities = np.array(universities.values, dtype=object)
+        self.countries = np.array(countries.values, dtype=object)
+        self.locations = np.array(locations.values, dtype=object)
+        geocodes = data.get("locations", {})
+        self.location_lat = np.array([geocodes.get(loc, {}).get("lat", np.nan) for loc in self.locations])
+        self.location_lon = np.array([geocodes.get(loc, {}).get("lon", np.nan) for loc in self.locations])
+
+        for key in ("university_id", "country_id", "location_id", "qs_rank"):
+            setattr(self, key, np.array(columns[key], dtype=np.int32))
+        self.cost = np.array(columns["cost"], dtype=float)
+        for key in ("name", "description", "area", "scholarship", "modality"):
+            setattr(self, key, np.array(columns[key], dtype=object))
+        self.courses = columns["courses"]
+
+    def __len__(self):
+        return len(self.name)
+
+    def program_text(self, i):
+        return " ".join([self.name[i], self.description[i], " ".join(self.courses[i])])
+
+    def program_texts(self):
+        return [self.program_text(i) for i in range(len(self))]
+
+    def frame(self, rows, columns=DISPLAY_COLUMNS):
+        """DataFrame of the selected row indices, gathered column by column."""
+        rows = np.asarray(rows, dtype=np.intp)
+        lookups = {
+            "university": lambda: self.universities[self.university_id[rows]],
+            "country": lambda: self.countries[self.country_id[rows]],
+            "location": lambda: self.locations[self.location_id[rows]],
+            "lat": lambda: self.location_lat[self.location_id[rows]],
+            "lon": lambda: self.location_lon[self.location_id[rows]],
+            "courses": lambda: [self.courses[i] for i in rows],
+        }
+        return pd.DataFrame({
+            col: lookups[col]() if col in lookups else getattr(self, col)[rows]
+            for col in columns
+        })
+
+
+def catalog_version(path=CATALOG_FILE):
+    """Cache key that changes whenever the catalog file is edited."""
+    return os.path.abspath(path), os.stat(path).st_mtime_ns
+
+
+def load_catalog(path=CATALOG_FILE):
+    """Return the process-wide Catalog for path, reloading only when the file changes."""
+    key = catalog_version(path)
+    with _cache_lock:
+        tracer.cache("catalog", key in _cache)
+        if key not in _cache:
+            with tracer.span("catalog.load", path=path), open(path, encoding="utf-8") as f:
+                catalog = Catalog(json.load(f))
+            _cache.clear()
+            _cache[key] = catalog
+        return _cache[key]
@@ -0,0 +1,194 @@
+"""Offline-first country metadata (capital, population, region, currency, languages, flag).
+
+Data is seeded from the bundled countries_snapshot.json, overlaid with any
+newer copy saved under .cache/, and served from a process-wide dictionary.
+Entries older than the TTL are refreshed from REST Countries on a background
+thread while the cached copy keeps being served, so pages never wait on the
+network once a country is known and still work with no connection at all.
+
+    python country_store.py snapshot Spain Germany Italy   # rebuild the bundled snapshot
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from fetch_pipeline import TIMEOUT, fetch_country, get_session, run_parallel
+from tracing import tracer
+
+SNAPSHOT_FILE = "countries_snapshot.json"
+OVERLAY_FILE = os.path.join(".cache", "countries.json")
+DEFAULT_TTL = 30 * 24 * 3600
+RETRY_INTERVAL = 3600  # minimum seconds between refresh attempts for the same country
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(record):
+    try:
+        return datetime.fromisoformat(record["fetched_at"]).timestamp()
+    except (KeyError, ValueError):
+        return 0.0
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("countries", {})
+
+
+def fetch_record(country, timeout=TIMEOUT):
+    """Fetch one country and its flag image from REST Countries as a storable record."""
+    info = fetch_country(country, timeout=timeout)
+    flag = b""
+    if info["flag_url"]:
+        with tracer.span("requests.get", url=info["flag_url"]):
+            response = get_session().get(info["flag_url"], timeout=timeout)
+        response.raise_for_status()
+        flag = response.content
+    return {
+        "name": country,
+        "capital": info["capital"],
+        "population": info["population"],
+        "region": info["region"],
+        "currency": info["currency"],
+        "languages": info["languages"],
+        "flag_png": base64.b64encode(flag).decode("ascii"),
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+class CountryStore:
+    def __init__(self, snapshot_path=SNAPSHOT_FILE, overlay_path=OVERLAY_FILE, ttl=DEFAULT_TTL, fetch=fetch_record):
+        self.overlay_path = overlay_path
+        self.ttl = ttl
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._last_attempt = {}
+        self._records = _read(snapshot_path)
+        for key, record in _read(overlay_path).items():
+            if _timestamp(record) >= _timestamp(self._records.get(key, {})):
+                self._records[key] = record
+        self._flags = {}
+
+    def get(self, country, fetch_missing=True):
+        """Return the info dict for country, or None if it is unknown and cannot be fetched.
+
+        The dict has capital, population, region, currency, languages and
+        flag (PNG bytes, possibly empty).
+        """
+        return self.get_many([country], fetch_missing)[country]
+
+    def get_many(self, countries, fetch_missing=True):
+        """get() for several countries; the unknown ones are fetched in parallel."""
+        keys = {country: country.lower().strip() for country in countries}
+        with self._lock:
+            records = {country: self._records.get(key) for country, key in keys.items()}
+        for record in records.values():
+            tracer.cache("country", record is not None)
+
+        misses = {keys[country]: country for country, record in records.items()
+                  if record is None and fetch_missing and not self._attempted_recently(keys[country])}
+        if misses:
+            # Unknown countries are the only case where a caller waits on the network
+            run_parallel({key: (lambda k=key, c=country: self._refresh(k, c)) for key, country in misses.items()})
+            with self._lock:
+                records = {country: record or self._records.get(keys[country]) for country, record in records.items()}
+
+        infos = {}
+        for country, record in records.items():
+            if record is None:
+                infos[country] = None
+                continue
+            if time.time() - _timestamp(record) > self.ttl:
+                self.refresh_in_background(country)
+            infos[country] = self._info(keys[country], record)
+        return infos
+
+    def _info(self, key, record):
+        with self._lock:
+            if key not in self._flags or self._flags[key][0] is not record:
+                self._flags[key] = (record, base64.b64decode(record.get("flag_png", "")))
+            flag = self._flags[key][1]
+        info = {field: record.get(field) for field in ("capital", "population", "region", "currency", "languages")}
+        info["flag"] = flag
+        return info
+
+    def _attempted_recently(self, key):
+        with self._lock:
+            return time.time() - self._last_attempt.get(key, 0) < RETRY_INTERVAL
+
+    def refresh_in_background(self, country):
+        key = country.lower().strip()
+        with self._lock:
+            if key in self._refreshing or time.time() - self._last_attempt.get(key, 0) < RETRY_INTERVAL:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, country), daemon=True).start()
+
+    def _refresh(self, key, country):
+        with self._lock:
+            self._last_attempt[key] = time.time()
+        try:
+            record = self.fetch(country)
+        except Exception as e:
+            logger.warning("Could not refresh country info for %s: %s", country, e)
+            return False
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+        with self._lock:
+            self._records[key] = record
+            self._save_overlay()
+        return True
+
+    def _save_overlay(self):
+        overlay = _read(self.overlay_path)
+        overlay.update({key: record for key, record in self._records.items()
+                        if _timestamp(record) > _timestamp(overlay.get(key, {}))})
+        os.makedirs(os.path.dirname(self.overlay_path) or ".", exist_ok=True)
+        tmp = f"{self.overlay_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"countries": overlay}, f)
+        os.replace(tmp, self.overlay_path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide CountryStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CountryStore()
+        return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Country metadata snapshot tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="Fetch countries and write the bundled snapshot")
+    snapshot.add_argument("countries", nargs="+")
+    snapshot.add_argument("--output", default=SNAPSHOT_FILE)
+    args = parser.parse_args(argv)
+
+    records = _read(args.output)
+    for country in args.countries:
+        records[country.lower().strip()] = fetch_record(country)
+        print(f"Fetched {country}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"countries": records}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Fetching of REST Countries data.
+
+Independent calls run on a bounded thread pool, so a page waits for the
+slowest call rather than the sum of all of them. HTTP requests share one
+pooled session with per-call timeouts and retries with exponential backoff.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tracing import tracer
+
+RESTCOUNTRIES_URL = os.getenv("RESTCOUNTRIES_URL", "https://restcountries.com/v3.1")
+MAX_WORKERS = 8
+TIMEOUT = (3.05, 10)  # (connect, read) seconds for each HTTP call
+RETRIES = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide requests session with a connection pool sized for MAX_WORKERS."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=RETRIES)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def run_parallel(tasks, max_workers=MAX_WORKERS, timeout=None):
+    """Run {name: zero-argument callable} concurrently.
+
+    Returns {name: (result, error)} where error is None on success. Tasks
+    still running after timeout seconds are reported with a TimeoutError.
+    """
+    if not tasks:
+        return {}
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    futures = {name: executor.submit(task) for name, task in tasks.items()}
+    wait(futures.values(), timeout=timeout)
+    # Don't block on stragglers; they finish in the background and their results are dropped
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done() or future.cancelled():
+            results[name] = (None, TimeoutError(f"{name} did not finish within {timeout}s"))
+        elif future.exception() is not None:
+            results[name] = (None, future.exception())
+        else:
+            results[name] = (future.result(), None)
+    return results
+
+
+def parse_country(data):
+    """Normalise one REST Countries record into the fields the app displays."""
+    currencies = list(data.get("currencies", {}).keys())
+    return {
+        "capital": (data.get("capital") or ["N/A"])[0],
+        "population": data.get("population"),
+        "region": data.get("region", "N/A"),
+        "currency": currencies[0] if currencies else "N/A",
+        "languages": list(data.get("languages", {}).values()),
+        "flag_url": data.get("flags", {}).get("png", ""),
+    }
+
+
+def fetch_country(country, session=None, base_url=None, timeout=TIMEOUT):
+    session = session or get_session()
+    url = f"{base_url or RESTCOUNTRIES_URL}/name/{country.lower().strip()}"
+    with tracer.span("requests.get", url=url):
+        response = session.get(url, params={"fullText": "true"}, timeout=timeout)
+    response.raise_for_status()
+    return parse_country(response.json()[0])
+
+
+def format_country_info(info):
+    """Display strings used by both the PDF report and the Country Info page."""
+    population = info.get("population")
+    return {
+        "Capital": info.get("capital", "N/A"),
+        "Population": f"{population:,}" if isinstance(population, int) else "N/A",
+        "Region": info.get("region", "N/A"),
+        "Currency": info.get("currency", "N/A"),
+        "Languages": ", ".join(info.get("languages", [])) or "N/A",
+    }
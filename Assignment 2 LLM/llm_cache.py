@@ -0,0 +1,228 @@
+"""Caching layer for Cohere chat calls.
+
+Responses are stored in SQLite keyed on (model, prompt), expire after a TTL
+and are evicted least-recently-used beyond max_entries. Identical requests
+issued while one is already in flight wait for that call instead of hitting
+the API again, for up to wait_timeout seconds before making their own.
+Responses can also be streamed chunk by chunk and are cached once complete.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from tracing import tracer
+
+CACHE_FILE = os.path.join(".cache", "llm_cache.db")
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_WAIT_TIMEOUT = 120  # seconds; longer than the app's 60 s Cohere client timeout
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(model, message):
+    return hashlib.sha256(f"{model}\x00{message}".encode("utf-8")).hexdigest()
+
+
+class CachedChat:
+    """Wraps a Cohere-style client.
+
+    The client needs chat(model=..., message=...).text, and chat_stream(...)
+    yielding events with event_type and text for stream().
+    """
+
+    def __init__(self, client, path=CACHE_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._metrics = {"hits": 0, "misses": 0, "deduplicated": 0, "errors": 0, "evictions": 0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def _claim(self, key):
+        """Return (cached text, None, False) on a hit, otherwise (None, future, owner).
+
+        The owner is the one caller that must call the API and resolve the future.
+        """
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self._metrics["hits"] += 1
+                tracer.cache("llm", True)
+                return cached, None, False
+            future = self._in_flight.get(key)
+            owner = future is None
+            tracer.cache("llm", not owner)
+            if owner:
+                future = self._in_flight[key] = Future()
+                self._metrics["misses"] += 1
+            else:
+                self._metrics["deduplicated"] += 1
+        return None, future, owner
+
+    def _wait(self, key, future):
+        """Another caller's result, or None if it is still pending after wait_timeout.
+
+        A request that timed out is dropped from the in-flight table, so this
+        and later callers issue their own instead of waiting on it again.
+        """
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            return None
+
+    def _resolve(self, key, model, future, text=None, error=None):
+        with self._lock:
+            if error is None:
+                self._store(key, model, text)
+            else:
+                self._metrics["errors"] += 1
+            # A newer request may have taken over the key after a waiter timed out on this one
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if error is None:
+            future.set_result(text)
+        else:
+            future.set_exception(error)
+
+    def _call(self, key, model, message, future):
+        try:
+            with tracer.span("cohere.chat", model=model, prompt_chars=len(message)):
+                text = self.client.chat(model=model, message=message).text
+        except Exception as e:
+            self._resolve(key, model, future, error=e)
+            raise
+        self._resolve(key, model, future, text)
+        return text
+
+    def chat(self, model, message):
+        """Return the response text for (model, message), calling the API only on a miss."""
+        key = cache_key(model, message)
+        cached, future, owner = self._claim(key)
+        if cached is not None:
+            return cached
+        if not owner:
+            text = self._wait(key, future)
+            return text if text is not None else self.chat(model, message)
+        return self._call(key, model, message, future)
+
+    def prefetch(self, model, message):
+        """Start fetching (model, message) on a background thread and return immediately.
+
+        A later chat() or stream() for the same prompt waits for this call
+        instead of issuing its own.
+        """
+        key = cache_key(model, message)
+        cached, future, owner = self._claim(key)
+        if owner:
+            def run():
+                try:
+                    self._call(key, model, message, future)
+                except Exception:
+                    pass  # surfaced to whoever reads the result
+            threading.Thread(target=run, daemon=True).start()
+
+    def stream(self, model, message):
+        """Yield the response text in chunks as the API produces them.
+
+        Cached and in-flight responses are yielded whole. A completed stream
+        is stored like a chat() response; an abandoned one is not.
+        """
+        key = cache_key(model, message)
+        cached, future, owner = self._claim(key)
+        if cached is not None:
+            yield cached
+            return
+        if not owner:
+            text = self._wait(key, future)
+            if text is None:
+                yield from self.stream(model, message)
+            else:
+                yield text
+            return
+
+        chunks = []
+        # Not activated: the caller runs other code between chunks
+        span = tracer.start("cohere.chat_stream", activate=False, model=model, prompt_chars=len(message))
+        try:
+            for event in self.client.chat_stream(model=model, message=message):
+                if event.event_type == "text-generation":
+                    if not chunks:
+                        span.set(first_token_ms=round((time.perf_counter() - span.start_perf) * 1000, 1))
+                    chunks.append(event.text)
+                    yield event.text
+        except Exception as e:
+            span.error = repr(e)
+            self._resolve(key, model, future, error=e)
+            raise
+        except GeneratorExit:
+            span.error = "abandoned"
+            self._resolve(key, model, future, error=RuntimeError("Stream closed before it finished"))
+            raise
+        finally:
+            span.set(chunks=len(chunks))
+            tracer.end(span)
+        self._resolve(key, model, future, "".join(chunks))
+
+    def _lookup(self, key):
+        now = time.time()
+        row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return row[0]
+
+    def _store(self, key, model, text):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, model, response, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, model, text, now, now),
+        )
+        excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._metrics["evictions"] += excess
+        self._conn.commit()
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = metrics["hits"] + metrics["misses"] + metrics["deduplicated"]
+        metrics["hit_rate"] = (metrics["hits"] + metrics["deduplicated"]) / lookups if lookups else 0.0
+        return metrics
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
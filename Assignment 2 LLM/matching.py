@@ -0,0 +1,35 @@
+"""Prompts and the keyword matching step of the Master Finder.
+
+Kept out of the Streamlit script so the benchmark can run the same code.
+"""
+LLM_MODEL = "command-r-plus"
+
+
+def extract_keywords_prompt(user_input):
+    return f"""
+    From the following user profile, extract key interests, preferred study fields (e.g., Data, Business), and career motivations.
+    User profile:
+    {user_input}
+    Return the result as a comma-separated list of keywords.
+    """
+
+
+def explain_matches_prompt(user_input, match_names):
+    return f"""
+    User background: {user_input}
+    Programs matched: {match_names}
+    Based on the user's interests and academic goals, explain in 2–3 sentences per program why each one would be a suitable match.
+    """
+
+
+def gap_analysis_prompt(user_input):
+    return f"""
+    User profile: {user_input}
+    Based on this profile, are there any types of master's programs or study areas NOT listed above that could still be a good fit? Suggest a few ideas and why.
+    """
+
+
+def keyword_matches(llm, index, user_input, min_rank=1, max_rank=1000):
+    """Extract keywords from the profile with the LLM and return index.search() results for them."""
+    keywords = llm.chat(LLM_MODEL, extract_keywords_prompt(user_input)).strip().lower().split(",")
+    return index.search(keywords, min_rank, max_rank)
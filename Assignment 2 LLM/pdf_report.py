@@ -0,0 +1,41 @@
+"""PDF export of matched programs and country details."""
+import os
+
+from fpdf import FPDF
+
+
+class PDF(FPDF):
+    def header(self):
+        if os.path.exists("master_finder_app.png"):
+            self.image("master_finder_app.png", 10, 5, 20)
+        self.set_font("Arial", "B", 10)
+        self.set_fill_color(240, 240, 240)
+        self.cell(0, 8, "Master's Program Recommendation Report", ln=True, align="C", fill=True)
+        self.ln(10)
+
+    def program_table(self, df):
+        self.set_font("Arial", size=6)
+        col_width = self.w / len(df.columns) - 2
+        self.ln(2)
+        for col in df.columns:
+            self.cell(col_width, 5, str(col).encode("latin-1", errors="replace").decode("latin-1"), border=1, align="C")
+        self.ln()
+        for _, row in df.iterrows():
+            for val in row:
+                if isinstance(val, float):
+                    val = "N/A" if val != val else f"{val:,.0f}"
+                val = str(val).encode("latin-1", errors="replace").decode("latin-1")
+                self.cell(col_width, 5, val, border=1, align="C")
+            self.ln()
+
+    def country_info(self, country_infos):
+        self.ln(3)
+        self.set_font("Arial", "B", 8)
+        self.cell(0, 6, "Country Information", ln=True)
+        self.set_font("Arial", size=6)
+        for country, info in country_infos.items():
+            self.ln(2)
+            self.cell(0, 4, f"- {country}".encode("latin-1", errors="replace").decode("latin-1"), ln=True)
+            for key, val in info.items():
+                line = f"   {key}: {val}"
+                self.cell(0, 4, line.encode("latin-1", errors="replace").decode("latin-1"), ln=True)
@@ -0,0 +1,142 @@
+"""Inverted keyword index over the program catalog.
+
+Program name, description and courses are tokenised and stemmed once when
+the index is built. A query only visits the postings of its own terms, and
+results are ranked with BM25. The QS ranking range filter is answered from
+a rank-sorted array or per-candidate lookups, so it never scans the catalog.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from tracing import tracer
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from i in into is it my of on or the to with want like "
+    "would love interested interest".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+# (suffix, replacement), longest first
+_SUFFIXES = (
+    ("ations", ""), ("ation", ""), ("ities", ""), ("ity", ""), ("ments", ""), ("ment", ""),
+    ("ings", ""), ("ing", ""), ("ies", "y"), ("ied", "y"), ("ed", ""), ("s", ""),
+)
+
+
+def stem(token):
+    """Light suffix-stripping stemmer: 'startups' -> 'startup', 'studies' -> 'study'."""
+    if token.endswith("ss"):
+        return token
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    return [stem(token) for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class ProgramIndex:
+    """BM25 index over every program in a catalog.Catalog.
+
+    Document ids are row indices of the catalog it was built from, kept as self.catalog.
+    """
+
+    def __init__(self, catalog, k1=1.2, b=0.75):
+        with tracer.span("program_index.build", programs=len(catalog)):
+            self._build(catalog, k1, b)
+
+    def _build(self, catalog, k1, b):
+        self.catalog = catalog
+        self.k1 = k1
+        self.b = b
+        self.size = len(catalog)
+        postings = defaultdict(list)
+        lengths = []
+        for doc_id, text in enumerate(catalog.program_texts()):
+            terms = tokenize(text)
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                postings[term].append((doc_id, count))
+
+        self.doc_lengths = np.asarray(lengths, dtype=float)
+        self.avg_length = float(self.doc_lengths.mean()) if len(lengths) else 0.0
+        self.postings = {
+            term: (np.array([d for d, _ in docs], dtype=np.int32), np.array([c for _, c in docs], dtype=float))
+            for term, docs in postings.items()
+        }
+        self.ranks = catalog.qs_rank
+        self._rank_order = np.argsort(self.ranks, kind="stable")
+        self._sorted_ranks = self.ranks[self._rank_order]
+
+    def __len__(self):
+        return self.size
+
+    def idf(self, term):
+        docs = len(self.postings[term][0]) if term in self.postings else 0
+        return math.log(1 + (self.size - docs + 0.5) / (docs + 0.5))
+
+    def _rank_slice(self, min_rank, max_rank):
+        lo = np.searchsorted(self._sorted_ranks, min_rank, side="left")
+        hi = np.searchsorted(self._sorted_ranks, max_rank, side="right")
+        return lo, hi
+
+    def docs_in_rank_range(self, min_rank, max_rank):
+        """Sorted ids of documents with min_rank <= QS rank <= max_rank."""
+        lo, hi = self._rank_slice(min_rank, max_rank)
+        return np.sort(self._rank_order[lo:hi])
+
+    def _bm25(self, term, docs):
+        """BM25 contribution of term to each of the sorted document ids in docs."""
+        posting_docs, tf = self.postings[term]
+        pos = np.minimum(np.searchsorted(posting_docs, docs), len(posting_docs) - 1)
+        tf = np.where(posting_docs[pos] == docs, tf[pos], 0.0)
+        norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avg_length)
+        return self.idf(term) * tf * (self.k1 + 1) / norm
+
+    def search(self, keywords, min_rank=1, max_rank=1000, top_k=None):
+        """Rank programs for a list of keyword phrases.
+
+        A program matches a phrase when it contains every term of that phrase,
+        and is returned when it matches at least one phrase and passes the QS
+        rank range. Scores are the BM25 sum over all query terms found in the
+        program. Returns [(doc_id, score)] best first.
+        """
+        with tracer.span("program_index.search", phrases=len(keywords)):
+            return self._search(keywords, min_rank, max_rank, top_k)
+
+    def _search(self, keywords, min_rank, max_rank, top_k):
+        phrases = [terms for terms in (tokenize(k) for k in keywords) if terms]
+        phrase_hits = []
+        for terms in phrases:
+            if any(term not in self.postings for term in terms):
+                continue
+            docs = self.postings[terms[0]][0]
+            for term in terms[1:]:
+                docs = np.intersect1d(docs, self.postings[term][0], assume_unique=True)
+            phrase_hits.append(docs)
+        if not phrase_hits:
+            return []
+
+        candidates = np.unique(np.concatenate(phrase_hits))
+        # Apply the rank predicate from whichever side is smaller
+        lo, hi = self._rank_slice(min_rank, max_rank)
+        if hi - lo < len(candidates):
+            in_range = np.sort(self._rank_order[lo:hi])
+            candidates = np.intersect1d(candidates, in_range, assume_unique=True)
+        else:
+            ranks = self.ranks[candidates]
+            candidates = candidates[(ranks >= min_rank) & (ranks <= max_rank)]
+        if not len(candidates):
+            return []
+
+        scores = np.zeros(len(candidates))
+        for term in {t for terms in phrases for t in terms if t in self.postings}:
+            scores += self._bm25(term, candidates)
+        order = np.argsort(-scores, kind="stable")
+        if top_k is not None:
+            order = order[:top_k]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
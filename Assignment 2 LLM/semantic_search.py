@@ -0,0 +1,111 @@
+"""Local semantic retrieval over the program catalog.
+
+Each program is embedded on the CPU with hashed word, word-pair and
+character n-gram features weighted by IDF. Character n-grams let
+"entrepreneurial" land near "entrepreneurship" and "analyse" near
+"analytics" without any network call. The matrix is stored as .npy under
+.cache/ and memory-mapped, and queries are answered with one vectorised
+cosine similarity, so matching can skip the keyword-extraction LLM call.
+"""
+import hashlib
+import json
+import os
+import zlib
+
+import numpy as np
+
+from program_index import tokenize
+from tracing import tracer
+
+DIM = 2048
+CACHE_DIR = ".cache"
+CHAR_NGRAMS = (3, 4, 5)
+
+
+def _features(text):
+    """(feature, weight) pairs: stemmed words, adjacent word pairs and character n-grams."""
+    tokens = tokenize(text)
+    for token in tokens:
+        yield f"w:{token}", 1.0
+        padded = f"<{token}>"
+        for n in CHAR_NGRAMS:
+            for i in range(len(padded) - n + 1):
+                yield f"c:{padded[i:i + n]}", 0.25
+    for first, second in zip(tokens, tokens[1:]):
+        yield f"b:{first} {second}", 1.0
+
+
+def hashed_counts(texts, dim=DIM):
+    """Signed feature-hashing counts, one row per text."""
+    counts = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature, weight in _features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            counts[row, h % dim] += weight if h & 0x80000000 else -weight
+    return counts
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _remove_stale(cache_dir, keep):
+    """Delete the vectors and IDF of earlier catalog versions, leaving in-progress writes alone."""
+    for name in os.listdir(cache_dir):
+        if name.startswith("program_") and name.endswith(".npy") and ".tmp" not in name and name not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass  # still memory-mapped by an older index on Windows; removed on a later rebuild
+
+
+class SemanticIndex:
+    """Dense vectors for every program with top-k cosine search.
+
+    Document ids are row indices of self.catalog, as in program_index.ProgramIndex.
+    """
+
+    def __init__(self, catalog, cache_dir=CACHE_DIR, dim=DIM):
+        self.catalog = catalog
+        self.dim = dim
+        self.ranks = catalog.qs_rank
+        texts = catalog.program_texts()
+        self.vectors, self.idf = self._load_or_build(texts, cache_dir)
+
+    def _load_or_build(self, texts, cache_dir):
+        digest = hashlib.sha256(json.dumps([self.dim, texts]).encode("utf-8")).hexdigest()[:16]
+        vectors_path = os.path.join(cache_dir, f"program_vectors_{digest}.npy")
+        idf_path = os.path.join(cache_dir, f"program_idf_{digest}.npy")
+        cached = os.path.exists(vectors_path) and os.path.exists(idf_path)
+        tracer.cache("semantic_vectors", cached)
+        if not cached:
+            with tracer.span("semantic.embed_catalog", programs=len(texts)):
+                counts = hashed_counts(texts, self.dim)
+            document_frequency = (counts != 0).sum(axis=0)
+            idf = (np.log((len(texts) + 1) / (document_frequency + 1)) + 1).astype(np.float32)
+            os.makedirs(cache_dir, exist_ok=True)
+            for path, array in ((vectors_path, _normalize(counts * idf)), (idf_path, idf)):
+                tmp = f"{path}.{os.getpid()}.tmp.npy"
+                np.save(tmp, array)
+                os.replace(tmp, path)
+            _remove_stale(cache_dir, {os.path.basename(vectors_path), os.path.basename(idf_path)})
+        return np.load(vectors_path, mmap_mode="r"), np.load(idf_path)
+
+    def embed(self, text):
+        return _normalize(hashed_counts([text], self.dim) * self.idf)[0]
+
+    def search(self, query, min_rank=1, max_rank=1000, top_k=10, min_score=0.05):
+        """Return [(doc_id, cosine)] for the top_k programs in the rank range, best first."""
+        with tracer.span("semantic.search"):
+            return self._search(query, min_rank, max_rank, top_k, min_score)
+
+    def _search(self, query, min_rank, max_rank, top_k, min_score):
+        scores = self.vectors @ self.embed(query)
+        scores[(self.ranks < min_rank) | (self.ranks > max_rank) | (scores < min_score)] = -np.inf
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top if np.isfinite(scores[doc_id])]
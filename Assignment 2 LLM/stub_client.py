@@ -0,0 +1,107 @@
+"""Local stand-ins for the Cohere client and the REST Countries API, for tests and benchmarks."""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+_TOKEN = re.compile(r"\S+\s*")
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def default_responder(message):
+    if "comma-separated list of keywords" in message:
+        profile = message.split("User profile:", 1)[-1].split("Return the result", 1)[0]
+        words = [w for w in re.findall(r"[a-zA-Z]+", profile.lower()) if len(w) > 3]
+        return ", ".join(dict.fromkeys(words)) or "data, business"
+    return f"Stub response for a {len(message)}-character prompt."
+
+
+class StubStreamEvent:
+    def __init__(self, event_type, text=""):
+        self.event_type = event_type
+        self.text = text
+
+
+class StubCohereClient:
+    """Mimics cohere.Client.chat and chat_stream and records every call it receives.
+
+    latency is the delay before a response (or its first streamed token);
+    token_delay is the delay between generated tokens; chat() waits for all of
+    them, chat_stream() yields each one as it is produced.
+    """
+
+    def __init__(self, latency=0.0, responder=default_responder, token_delay=0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.responder = responder
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def chat(self, model, message, **kwargs):
+        with self._lock:
+            self.calls.append((model, message))
+        text = self.responder(message)
+        # A blocking call returns once the whole response has been generated
+        delay = self.latency + self.token_delay * max(0, len(_TOKEN.findall(text)) - 1)
+        if delay:
+            time.sleep(delay)
+        return StubResponse(text)
+
+    def chat_stream(self, model, message, **kwargs):
+        with self._lock:
+            self.calls.append((model, message))
+        if self.latency:
+            time.sleep(self.latency)
+        yield StubStreamEvent("stream-start")
+        for i, token in enumerate(_TOKEN.findall(self.responder(message))):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield StubStreamEvent("text-generation", token)
+        yield StubStreamEvent("stream-end")
+
+
+def serve_countries(records, delay=0.0, failures=0, port=0):
+    """Start a local REST Countries stand-in on a background thread.
+
+    records maps lower-case country names to REST Countries JSON objects.
+    Each request sleeps for delay seconds, and the first `failures` requests
+    answer 503 so retry logic can be exercised. Returns (server, base_url);
+    call server.shutdown() when done.
+    """
+    state = {"failures": failures}
+    lock = threading.Lock()
+
+    class CountriesHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)
+            with lock:
+                fail = state["failures"] > 0
+                state["failures"] -= fail
+            name = unquote(urlparse(self.path).path.rsplit("/", 1)[-1]).lower()
+            if fail:
+                status, body = 503, {"message": "Service Unavailable"}
+            elif name in records:
+                status, body = 200, [records[name]]
+            else:
+                status, body = 404, {"status": 404, "message": "Not Found"}
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), CountriesHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
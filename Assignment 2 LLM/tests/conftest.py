@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app's modules live one level up and read their data files relative to that folder
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
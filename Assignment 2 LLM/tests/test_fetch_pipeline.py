@@ -0,0 +1,93 @@
+import time
+
+import pytest
+import requests
+
+import fetch_pipeline
+from country_store import CountryStore, fetch_record
+from fetch_pipeline import fetch_country, get_session, run_parallel
+from stub_client import serve_countries
+
+SPAIN = {
+    "capital": ["Madrid"],
+    "population": 47351567,
+    "region": "Europe",
+    "currencies": {"EUR": {"name": "Euro", "symbol": "€"}},
+    "languages": {"spa": "Spanish"},
+    "flags": {"png": ""},
+}
+RECORDS = {"spain": SPAIN, "germany": dict(SPAIN, capital=["Berlin"]), "italy": dict(SPAIN, capital=["Rome"])}
+
+
+@pytest.fixture
+def countries_server():
+    servers = []
+
+    def start(**options):
+        server, base_url = serve_countries(RECORDS, **options)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fetch_country_parses_record(countries_server):
+    info = fetch_country("Spain", base_url=countries_server())
+    assert info == {"capital": "Madrid", "population": 47351567, "region": "Europe", "currency": "EUR",
+                    "languages": ["Spanish"], "flag_url": ""}
+
+
+def test_503_responses_are_retried(countries_server):
+    assert fetch_country("Spain", base_url=countries_server(failures=2))["capital"] == "Madrid"
+
+
+def test_persistent_503_raises_after_retries(countries_server):
+    with pytest.raises(requests.exceptions.RetryError):
+        fetch_country("Spain", base_url=countries_server(failures=fetch_pipeline.RETRIES.total + 1))
+
+
+def test_unknown_country_raises_http_error(countries_server):
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        fetch_country("Atlantis", base_url=countries_server())
+    assert error.value.response.status_code == 404
+
+
+def test_read_timeout_raises(countries_server):
+    base_url = countries_server(delay=0.5)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        # A session without retries, so the timeout surfaces directly
+        fetch_country("Spain", session=requests.Session(), base_url=base_url, timeout=(1, 0.1))
+
+
+def test_run_parallel_reports_timeouts_and_errors(countries_server):
+    base_url = countries_server(delay=1.0)
+    session = get_session()
+    start = time.perf_counter()
+    results = run_parallel({
+        "slow": lambda: fetch_country("Spain", session, base_url),
+        "fast": lambda: 42,
+        "broken": lambda: 1 / 0,
+    }, timeout=0.2)
+    assert time.perf_counter() - start < 0.9
+    assert results["fast"] == (42, None)
+    assert isinstance(results["broken"][1], ZeroDivisionError)
+    assert results["slow"][0] is None and isinstance(results["slow"][1], TimeoutError)
+
+
+def test_country_store_fetches_misses_in_parallel(countries_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(fetch_pipeline, "RESTCOUNTRIES_URL", countries_server(delay=0.3))
+    store = CountryStore(snapshot_path=str(tmp_path / "snapshot.json"), overlay_path=str(tmp_path / "overlay.json"),
+                         fetch=fetch_record)
+    start = time.perf_counter()
+    infos = store.get_many(["Spain", "Germany", "Italy", "Atlantis"])
+    assert time.perf_counter() - start < 0.9
+    assert {country: info and info["capital"] for country, info in infos.items()} == {
+        "Spain": "Madrid", "Germany": "Berlin", "Italy": "Rome", "Atlantis": None}
+    assert infos["Spain"]["flag"] == b""
+    # Known countries are served from memory; the failed lookup is not retried straight away
+    assert store.get("Atlantis") is None
+    assert CountryStore(snapshot_path=str(tmp_path / "snapshot.json"),
+                        overlay_path=str(tmp_path / "overlay.json")).get("Italy", fetch_missing=False)["capital"] == "Rome"
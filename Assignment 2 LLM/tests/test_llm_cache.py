@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+
+from llm_cache import CachedChat
+from stub_client import StubCohereClient
+
+MODEL = "command-r-plus"
+
+
+def make_cache(tmp_path, client=None, **options):
+    return CachedChat(client or StubCohereClient(), path=str(tmp_path / "llm_cache.db"), **options)
+
+
+def call_concurrently(fn, n):
+    barrier = threading.Barrier(n)
+    results, errors = [None] * n, [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_repeated_prompt_is_served_from_cache(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client)
+    assert llm.chat(MODEL, "hello") == llm.chat(MODEL, "hello")
+    assert len(client.calls) == 1
+    # The cache is persistent: a new instance on the same file answers without the API
+    assert make_cache(tmp_path, client).chat(MODEL, "hello") == llm.chat(MODEL, "hello")
+    assert len(client.calls) == 1
+
+
+def test_concurrent_identical_requests_make_one_call(tmp_path):
+    client = StubCohereClient(latency=0.2)
+    llm = make_cache(tmp_path, client)
+    results, errors = call_concurrently(lambda: llm.chat(MODEL, "same prompt"), 10)
+    assert errors == [None] * 10
+    assert len(set(results)) == 1
+    assert len(client.calls) == 1
+    metrics = llm.metrics()
+    assert metrics["misses"] == 1
+    assert metrics["hits"] + metrics["deduplicated"] == 9
+
+
+def test_expired_entry_is_refetched(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client, ttl=0.1)
+    llm.chat(MODEL, "hello")
+    llm.chat(MODEL, "hello")
+    assert len(client.calls) == 1
+    time.sleep(0.15)
+    llm.chat(MODEL, "hello")
+    assert len(client.calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client, max_entries=2)
+    llm.chat(MODEL, "a")
+    llm.chat(MODEL, "b")
+    llm.chat(MODEL, "a")  # a is now more recently used than b
+    llm.chat(MODEL, "c")
+    metrics = llm.metrics()
+    assert metrics["entries"] == 2
+    assert metrics["evictions"] == 1
+
+    calls = len(client.calls)
+    llm.chat(MODEL, "a")
+    assert len(client.calls) == calls
+    llm.chat(MODEL, "b")
+    assert len(client.calls) == calls + 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(tmp_path):
+    def failing(message):
+        time.sleep(0.2)  # long enough for every caller to join the in-flight request
+        raise ConnectionError("API down")
+
+    client = StubCohereClient(responder=failing)
+    llm = make_cache(tmp_path, client)
+    results, errors = call_concurrently(lambda: llm.chat(MODEL, "hello"), 5)
+    assert all(isinstance(error, ConnectionError) for error in errors)
+    assert len(client.calls) == 1
+    assert llm.metrics()["errors"] == 1
+
+    client.responder = lambda message: "recovered"
+    assert llm.chat(MODEL, "hello") == "recovered"
+    assert len(client.calls) == 2
+
+
+def test_prefetch_is_picked_up_by_chat(tmp_path):
+    client = StubCohereClient(latency=0.1)
+    llm = make_cache(tmp_path, client)
+    llm.prefetch(MODEL, "hello")
+    assert llm.chat(MODEL, "hello") == client.responder("hello")
+    assert len(client.calls) == 1
+
+
+def test_metrics_and_clear(tmp_path):
+    llm = make_cache(tmp_path)
+    llm.chat(MODEL, "a")
+    llm.chat(MODEL, "a")
+    llm.chat(MODEL, "b")
+    metrics = llm.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (1, 2, 2)
+    assert metrics["hit_rate"] == pytest.approx(1 / 3)
+    llm.clear()
+    assert llm.metrics()["entries"] == 0
+
+
+def test_completed_stream_is_cached(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client)
+    chunks = list(llm.stream(MODEL, "hello"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == client.responder("hello")
+    assert llm.chat(MODEL, "hello") == "".join(chunks)
+    assert list(llm.stream(MODEL, "hello")) == ["".join(chunks)]
+    assert len(client.calls) == 1
+
+
+def test_abandoned_stream_releases_the_request(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client)
+    stream = llm.stream(MODEL, "hello")
+    next(stream)
+    stream.close()
+    assert llm.metrics()["entries"] == 0
+    # Not cached and no longer in flight: the next caller makes its own call
+    assert llm.chat(MODEL, "hello") == client.responder("hello")
+    assert len(client.calls) == 2
+
+
+def test_second_reader_waits_for_in_flight_stream(tmp_path):
+    client = StubCohereClient(token_delay=0.02)
+    llm = make_cache(tmp_path, client)
+    started = threading.Event()
+    first = []
+
+    def read_stream():
+        for chunk in llm.stream(MODEL, "hello"):
+            first.append(chunk)
+            started.set()
+
+    reader = threading.Thread(target=read_stream)
+    reader.start()
+    started.wait(5)
+    second = list(llm.stream(MODEL, "hello"))
+    reader.join()
+    assert second == ["".join(first)]
+    assert len(client.calls) == 1
+    assert llm.metrics()["deduplicated"] == 1
+
+
+def test_stream_error_reaches_waiters_and_is_not_cached(tmp_path):
+    def failing(message):
+        raise ConnectionError("API down")
+
+    client = StubCohereClient(responder=failing)
+    llm = make_cache(tmp_path, client)
+    with pytest.raises(ConnectionError):
+        list(llm.stream(MODEL, "hello"))
+    assert llm.metrics()["entries"] == 0
+
+
+def test_suspended_stream_does_not_block_later_requests(tmp_path):
+    client = StubCohereClient()
+    llm = make_cache(tmp_path, client, wait_timeout=0.2)
+    stream = llm.stream(MODEL, "hello")
+    next(stream)  # left suspended, never closed
+
+    start = time.perf_counter()
+    assert llm.chat(MODEL, "hello") == client.responder("hello")
+    assert time.perf_counter() - start < 1
+    assert len(client.calls) == 2
+    # Later requests are answered from the cache, and closing the stale stream changes nothing
+    stream.close()
+    assert list(llm.stream(MODEL, "hello")) == [client.responder("hello")]
+    assert len(client.calls) == 2
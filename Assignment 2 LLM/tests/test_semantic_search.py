@@ -0,0 +1,27 @@
+import json
+import os
+
+from catalog import CATALOG_FILE, Catalog
+from semantic_search import SemanticIndex
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_data():
+    with open(os.path.join(APP_DIR, CATALOG_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_rebuild_removes_vectors_of_earlier_catalogs(tmp_path):
+    data = load_data()
+    SemanticIndex(Catalog(data), cache_dir=str(tmp_path))
+    first = set(os.listdir(tmp_path))
+    assert len(first) == 2
+    (tmp_path / "program_vectors_other.npy.123.tmp.npy").write_bytes(b"")  # another process mid-write
+
+    data["universities"] = data["universities"][1:]
+    index = SemanticIndex(Catalog(data), cache_dir=str(tmp_path))
+    remaining = set(os.listdir(tmp_path))
+    assert remaining.isdisjoint(first)
+    assert len(remaining) == 3 and "program_vectors_other.npy.123.tmp.npy" in remaining
+    assert index.search("data analytics", top_k=1)
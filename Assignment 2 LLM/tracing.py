@@ -0,0 +1,23 @@
+"""Tracing for the Master Finder.
+
+The tracer is perf_tools.tracing at the repository root, shared by both apps;
+this module names the service and holds the process-wide instance:
+
+    with tracer.span("catalog.load", path=path):
+        ...
+"""
+import os
+import sys
+
+# The apps run from their own folders; the shared package lives one level up
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
+
+from perf_tools.tracing import Tracer, to_otlp, trace_rows  # noqa: E402
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "master-finder-app")
+
+tracer = Tracer(SERVICE_NAME)
+
+__all__ = ["SERVICE_NAME", "to_otlp", "trace_rows", "tracer"]
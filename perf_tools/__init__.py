@@ -0,0 +1,6 @@
+"""Tracing, deferred startup and benchmarking helpers shared by both apps.
+
+Each app configures them in its own tracing.py, startup.py and benchmark.py,
+which put this repository root on sys.path so the package can be imported
+when an app is run from its own folder.
+"""
@@ -0,0 +1,83 @@
+"""Timing, regression comparison and the command line shared by the apps' benchmark.py scripts.
+
+Each app's benchmark.py defines its cases and a run(quick) function that
+returns a report dict with a "results" list of measure() results.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+MIN_DELTA = 0.001  # seconds; smaller slowdowns are treated as noise
+
+
+def measure(name, fn, repeat=5, warmup=1, items=None, setup=None, **params):
+    """Time fn() repeat times after warmup calls; setup() runs untimed before each call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "mean_s": statistics.fmean(times),
+        "p50_s": statistics.median(times),
+        "p95_s": times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))],
+        "min_s": times[0],
+        "max_s": times[-1],
+    }
+    if items:
+        result["items_per_s"] = items / result["p50_s"] if result["p50_s"] else float("inf")
+    print(f"{name:<28} {json.dumps(params):<32} p50 {result['p50_s'] * 1000:10.3f} ms", file=sys.stderr)
+    return result
+
+
+def compare(report, baseline, tolerance, min_delta=MIN_DELTA):
+    """Return the cases whose best time grew by more than tolerance (and min_delta seconds) against the baseline.
+
+    Best-of-N times are compared because they are the least sensitive to
+    background load on the machine.
+    """
+    previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if old is None:
+            continue
+        if result["min_s"] > old["min_s"] * (1 + tolerance) and result["min_s"] - old["min_s"] > min_delta:
+            regressions.append({"name": result["name"], "params": result["params"],
+                                "baseline_min_s": old["min_s"], "min_s": result["min_s"],
+                                "ratio": result["min_s"] / old["min_s"]})
+    return regressions
+
+
+def main(run, description, argv=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and smaller sizes")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    report = run(args.quick)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION {regression['name']} {json.dumps(regression['params'])}: "
+              f"{regression['ratio']:.2f}x slower", file=sys.stderr)
+    return 1 if report.get("regressions") else 0
@@ -0,0 +1,112 @@
+"""Deferred loading of heavy dependencies and resources.
+
+An app imports only what its first screen needs. Everything else is a named
+warm-up task: warmup.result(name) returns the task's value, waiting for a
+background run already in progress or running it inline, and
+warmup.preload() starts the remaining tasks on a background thread once the
+first screen has been sent.
+
+Each app's startup.py defines its import budgets and runs the check:
+
+    python startup.py check
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Process-wide registry of lazily built resources that can be warmed in the background."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._tasks = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._preloading = False
+
+    def register(self, name, fn):
+        self._tasks[name] = fn
+
+    def result(self, name):
+        """The value of task name, computed at most once per process (failures are retried on the next call)."""
+        with self._lock:
+            future = self._futures.get(name)
+            owner = future is None
+            if owner:
+                future = self._futures[name] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            with self.tracer.span("startup.load", resource=name):
+                value = self._tasks[name]()
+        except Exception as e:
+            with self._lock:
+                del self._futures[name]
+            future.set_exception(e)
+            raise
+        future.set_result(value)
+        return value
+
+    def preload(self, names=None):
+        """Warm the given tasks (default: all) on one background thread, once per process."""
+        with self._lock:
+            if self._preloading:
+                return
+            self._preloading = True
+        names = list(self._tasks) if names is None else names
+
+        def run():
+            for name in names:
+                try:
+                    self.result(name)
+                except Exception as e:
+                    logger.warning("Preloading %s failed: %s", name, e)
+
+        threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def import_time_ms(statement, setup="import streamlit"):
+    """Milliseconds taken by statement in a fresh interpreter, after setup has run."""
+    code = (f"import time\n{setup}\n"
+            "start = time.perf_counter()\n"
+            f"{statement}\n"
+            "print((time.perf_counter() - start) * 1000)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def check_budgets(budgets, app_imports, statements=None, runs=3):
+    """Best-of-runs import time per entry, with whether it fits its budget.
+
+    The "app" entry times app_imports after `import streamlit`; every other
+    entry times its statement (default `import <name>`) after app_imports.
+    """
+    statements = statements or {}
+    results = {}
+    for name, budget in budgets.items():
+        if name == "app":
+            ms = min(import_time_ms(app_imports) for _ in range(runs))
+        else:
+            statement = statements.get(name, f"import {name}")
+            ms = min(import_time_ms(statement, f"import streamlit\n{app_imports}") for _ in range(runs))
+        results[name] = {"ms": round(ms, 1), "budget_ms": budget, "ok": ms <= budget}
+    return results
+
+
+def main(budgets, app_imports, statements=None, argv=None):
+    parser = argparse.ArgumentParser(description="Startup import-time budgets")
+    parser.add_argument("command", choices=["check"])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = check_budgets(budgets, app_imports, statements, runs=args.runs)
+    print(json.dumps(results, indent=2))
+    return 0 if all(result["ok"] for result in results.values()) else 1
@@ -0,0 +1,257 @@
+"""Lightweight tracing for the apps' hot paths.
+
+Spans record wall time, process memory (RSS) change and attributes, nest per
+thread, and are grouped into one trace per Streamlit rerun:
+
+    with tracer.span("model.predict", rows=len(frame)):
+        ...
+
+Besides per-name totals and cache hit counters kept for the whole process,
+finished traces are:
+
+- logged as one JSON line per span on the "tracing" logger at DEBUG level;
+- appended as OpenTelemetry (OTLP/JSON) documents to TRACE_FILE when that
+  environment variable is set.
+
+Each app creates its own Tracer with its service name in its tracing.py.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+TRACE_FILE = os.getenv("TRACE_FILE")
+MAX_TRACES = 50
+
+logger = logging.getLogger("tracing")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_statm = {"pid": None, "fd": -1}
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where /proc is not available."""
+    # Kept open and re-read with pread, which costs about a microsecond; reopened after a fork
+    if _statm["pid"] != os.getpid():
+        try:
+            _statm["fd"] = os.open("/proc/self/statm", os.O_RDONLY)
+        except (AttributeError, OSError):
+            _statm["fd"] = -1
+        _statm["pid"] = os.getpid()
+    if _statm["fd"] < 0:
+        return None
+    return int(os.pread(_statm["fd"], 64, 0).split()[1]) * _PAGE_SIZE
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "depth", "start_ns", "end_ns", "start_perf",
+                 "duration", "rss_start", "memory_delta", "attributes", "error")
+
+    def __init__(self, name, trace_id, parent, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.depth = parent.depth + 1 if parent else 0
+        self.attributes = attributes
+        self.error = None
+        self.duration = None
+        self.memory_delta = None
+        self.rss_start = rss_bytes()
+        self.start_ns = time.time_ns()
+        self.start_perf = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def as_dict(self):
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "start_ns": self.start_ns, "end_ns": self.end_ns, "duration_ms": self.duration * 1000,
+            "memory_delta_bytes": self.memory_delta, "attributes": self.attributes, "error": self.error,
+        }
+
+
+class Tracer:
+    """Collects spans, per-name timing totals and counters for the whole process."""
+
+    def __init__(self, service_name, trace_file=TRACE_FILE, max_traces=MAX_TRACES):
+        self.service_name = service_name
+        self.trace_file = trace_file
+        self.traces = deque(maxlen=max_traces)
+        self.totals = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "errors": 0})
+        self.counters = defaultdict(int)
+        self._local = threading.local()
+        self._pending = {}  # trace id -> finished spans, while the root span is still open (at most max_traces)
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start(self, name, activate=True, **attributes):
+        """Open a span under the thread's current one; prefer span() unless the span outlives a block.
+
+        Spans started with activate=False do not become the parent of later
+        spans, which suits work that is suspended and resumed, like a generator.
+        """
+        parent = self.current()
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        span = Span(name, trace_id, parent, attributes)
+        if parent is None:
+            with self._lock:
+                self._pending[trace_id] = []
+                # Roots that never end (a rerun that raised or called st.stop) are dropped, oldest first
+                while len(self._pending) > self.traces.maxlen:
+                    del self._pending[next(iter(self._pending))]
+        if activate:
+            self._stack().append(span)
+        return span
+
+    def start_trace(self, name, **attributes):
+        """Open the root span of a new trace, dropping anything left open on this thread."""
+        stack = self._stack()
+        with self._lock:
+            for span in stack:
+                self._pending.pop(span.trace_id, None)
+        stack.clear()
+        return self.start(name, **attributes)
+
+    def end(self, span):
+        """Close span. Closing a root span finishes its trace and returns all of its spans."""
+        span.end_ns = time.time_ns()
+        span.duration = time.perf_counter() - span.start_perf
+        rss = rss_bytes()
+        if rss is not None and span.rss_start is not None:
+            span.memory_delta = rss - span.rss_start
+        stack = self._stack()
+        if span in stack:
+            del stack[stack.index(span):]
+
+        with self._lock:
+            totals = self.totals[span.name]
+            totals["calls"] += 1
+            totals["seconds"] += span.duration
+            totals["max_seconds"] = max(totals["max_seconds"], span.duration)
+            totals["errors"] += span.error is not None
+            if span.parent_id is not None:
+                # Spans that end after their trace (e.g. an abandoned stream) only count towards the totals
+                if span.trace_id in self._pending:
+                    self._pending[span.trace_id].append(span)
+                return None
+            spans = self._pending.pop(span.trace_id, [])
+            spans.append(span)
+            spans.sort(key=lambda s: s.start_perf)
+            self.traces.append(spans)
+        self._export(spans)
+        return spans
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span = self.start(name, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.error = repr(e)
+            raise
+        finally:
+            self.end(span)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def cache(self, name, hit):
+        """Count a cache lookup and note the outcome on the current span."""
+        self.count(f"{name}.{'hits' if hit else 'misses'}")
+        span = self.current()
+        if span is not None:
+            span.attributes[f"cache.{name}"] = "hit" if hit else "miss"
+
+    def hit_rates(self):
+        with self._lock:
+            counters = dict(self.counters)
+        rates = {}
+        for key in counters:
+            if key.endswith(".hits"):
+                name = key[:-len(".hits")]
+                hits, misses = counters[key], counters.get(f"{name}.misses", 0)
+                rates[name] = hits / (hits + misses)
+            elif key.endswith(".misses") and f"{key[:-len('.misses')]}.hits" not in counters:
+                rates[key[:-len(".misses")]] = 0.0
+        return rates
+
+    def summary(self):
+        """Per-span-name totals, counters and cache hit rates since the process started."""
+        with self._lock:
+            totals = {name: dict(values) for name, values in self.totals.items()}
+            counters = dict(self.counters)
+        return {"spans": totals, "counters": counters, "cache_hit_rates": self.hit_rates()}
+
+    def _export(self, spans):
+        if logger.isEnabledFor(logging.DEBUG):
+            for span in spans:
+                logger.debug(json.dumps(span.as_dict(), default=str))
+        if self.trace_file:
+            line = json.dumps(to_otlp(spans, self.service_name), default=str)
+            with self._lock, open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(spans, service_name):
+    """The spans as an OTLP/JSON ExportTraceServiceRequest document."""
+    otlp_spans = []
+    for span in spans:
+        attributes = dict(span.attributes)
+        attributes["process.memory.delta_bytes"] = span.memory_delta
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        otlp_spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+def trace_rows(spans):
+    """One display row per span, indented by depth, for the debug panel."""
+    return [{
+        "span": "  " * span.depth + span.name,
+        "ms": round(span.duration * 1000, 2),
+        "memory (MB)": None if span.memory_delta is None else round(span.memory_delta / 2 ** 20, 2),
+        "details": ", ".join(f"{key}={value}" for key, value in span.attributes.items()),
+    } for span in spans]
+